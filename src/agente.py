@@ -1,16 +1,14 @@
 import json
 import os
 from dotenv import load_dotenv
-import pandas as pd
 import matplotlib.pyplot as plt
 from openai import OpenAI
 import numpy as np
 
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-
-from functions.tools import tools            # lista de definições de funções para o modelo
-from functions.dispatcher import call_function
+from functions.roteador_tools import selecionar_tools   # subconjunto de tools relevante à pergunta
+from functions.dispatcher import argumentos_do_modelo, call_function
+from functions.rag import aquecer_rag
+from functions.dados_folha import cabecalho   # header usado no system prompt
 
 # ------------------------------------------------------------
 # Função auxiliar que plota um insight retornado pelas funções
@@ -59,25 +57,16 @@ env_file = os.getenv("ENV_FILE", ".env")
 load_dotenv(env_file)
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# ------------------------------------------------------------
-# Lê o CSV para extrair header (usado no system prompt)
-# ------------------------------------------------------------
-
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-csv_path = os.path.join(base_dir, "src", "data", "Dados.csv")
-
-
-df = pd.read_csv(csv_path)
-cabecalho = df.columns.tolist()
+# Colaborador consultado (e-mail ou PIS); vazio só serve para folhas de um único colaborador
+colaborador = os.getenv("COLABORADOR") or None
 
 # ------------------------------------------------------------
-# (Opcional) RAG via Chroma se você quiser usar na conversa
+# RAG: criado sob demanda na primeira consulta a documentos
+# (RAG_AQUECER=1 antecipa a criação em segundo plano)
 # ------------------------------------------------------------
 
-retriever = Chroma(
-    persist_directory="./.chrome_langchain_db",
-    embedding_function=OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY")),
-).as_retriever()
+if os.getenv("RAG_AQUECER") == "1":
+    aquecer_rag()
 
 # ------------------------------------------------------------
 # Prompt de sistema
@@ -119,7 +108,7 @@ while True:
     completion = client.chat.completions.create(
         model="gpt-4.1-mini-2025-04-14",
         messages=messages,
-        tools=tools,
+        tools=selecionar_tools(user_question, messages),
     )
 
     assistant_message = completion.choices[0].message
@@ -134,13 +123,13 @@ while True:
         for call in assistant_message.tool_calls:
             nome = call.function.name
             try:
-                argumentos = json.loads(call.function.arguments)
+                argumentos = argumentos_do_modelo(json.loads(call.function.arguments))
             except json.JSONDecodeError:
                 argumentos = {}
 
             # executa função real
             try:
-                resultado = call_function(nome, argumentos)
+                resultado = call_function(nome, argumentos, colaborador)
             except Exception as e:
                 resultado = {"erro": str(e)}
                 
@@ -1,33 +1,47 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response, Header, Cookie
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import os, json, io, base64
-import pandas as pd
+import os, json, base64, gzip, uuid, asyncio, weakref
+from functools import lru_cache
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-from typing import List, Any, Dict
-
-from openai import OpenAI
-from functions.tools import tools
-from functions.dispatcher import call_function
+from typing import List, Any, Dict, Optional
+
+from openai import AsyncOpenAI
+from functions.roteador_tools import selecionar_tools
+from functions.dispatcher import (
+    call_function,
+    call_functions_lote,
+    call_functions_async,
+    iter_functions_async,
+    argumentos_do_modelo,
+    cache_resultados,
+    estatisticas_tools,
+)
+from functions import dados_folha
+from functions.rag import aquecer_rag, obter_cache
+from functions.dados_folha import registros_json
+from sessoes import criar_store_sessoes, compactar_historico, limitar_historico
+import graficos
 
 # ------------------------------------------------------------------
 # Configuração inicial
 # ------------------------------------------------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-csv_path = os.path.join(base_dir, "src", "data", "Dados.csv")
-
-
-df = pd.read_csv(csv_path)
-cabecalho = df.columns.tolist()
-
-app = FastAPI()
-
+# Cliente assíncrono: /chat não ocupa uma thread durante as chamadas à OpenAI
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+MODELO = "gpt-4.1-mini-2025-04-14"
 
 # ------------------------------------------------------------------
-# Utilitário para converter valores NumPy → tipos nativos
+# Serialização JSON: uma única passagem, com suporte a NumPy.
+# Com orjson instalado, arrays e escalares NumPy são serializados
+# nativamente (e NaN vira null); sem ele, usa-se o json da biblioteca padrão.
 # ------------------------------------------------------------------
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
 def convert_numpy_types(obj: Any):
     import numpy as np
     if isinstance(obj, (np.integer,)):
@@ -39,9 +53,40 @@ def convert_numpy_types(obj: Any):
     return str(obj)
 
 
-def safe_response(data: Dict):
-    """Garante que o payload só contenha tipos JSON‐serializáveis."""
-    return json.loads(json.dumps(data, default=convert_numpy_types))
+def json_bytes(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=convert_numpy_types, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, ensure_ascii=False, default=convert_numpy_types).encode("utf-8")
+
+
+class RespostaJSON(Response):
+    """Resposta JSON serializada uma única vez, direto do payload (NumPy incluído)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+def safe_response(data: Dict) -> RespostaJSON:
+    """Payload com tipos NumPy/pandas pronto para envio, sem ida e volta pelo json."""
+    return RespostaJSON(data)
+
+
+app = FastAPI(default_response_class=RespostaJSON)
+
+
+@app.on_event("startup")
+def aquecer():
+    # RAG_AQUECER=1 cria o RAG em segundo plano; sem isso ele nasce na 1ª consulta a documentos
+    if os.getenv("RAG_AQUECER") == "1":
+        aquecer_rag()
+
+
+@app.on_event("shutdown")
+def encerrar():
+    graficos.encerrar()
 
 
 # ------------------------------------------------------------------
@@ -49,34 +94,59 @@ def safe_response(data: Dict):
 # ------------------------------------------------------------------
 class Pergunta(BaseModel):
     mensagem: str
+    colaborador: Optional[str] = None  # e-mail ou PIS; restringe as consultas
 
 
 class Chamada(BaseModel):
     nome: str
     argumentos: dict
+    colaborador: Optional[str] = None
 
 
-# ------------------------------------------------------------------
-# Armazena contexto do chat em memória (simplificado)
-# ------------------------------------------------------------------
-chat_history: List[Dict] = []
+class Lote(BaseModel):
+    chamadas: List[Chamada]
+    colaborador: Optional[str] = None  # vale para as chamadas que não informam o seu
 
 
 # ------------------------------------------------------------------
-# ENDPOINT /chat
+# Conversas por sessão (header X-Sessao-Id ou cookie sessao_id)
 # ------------------------------------------------------------------
-@app.post("/chat")
-def conversar(pergunta: Pergunta):
-    global chat_history
+sessoes = criar_store_sessoes()
+MAX_MENSAGENS_SESSAO = int(os.getenv("SESSOES_MAX_MENSAGENS", "40"))
+MAX_TOKENS_SESSAO = int(os.getenv("SESSOES_MAX_TOKENS", "6000"))
+HEADER_SESSAO = "X-Sessao-Id"
+COOKIE_SESSAO = "sessao_id"
+
+# um lock por sessão: turnos concorrentes da mesma sessão não se intercalam
+locks_sessao: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def resolver_sessao(x_sessao_id: Optional[str], cookie_sessao: Optional[str]) -> str:
+    return x_sessao_id or cookie_sessao or uuid.uuid4().hex
+
 
-    system_prompt = f"""
+def lock_da_sessao(sessao_id: str) -> asyncio.Lock:
+    lock = locks_sessao.get(sessao_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        locks_sessao[sessao_id] = lock
+    return lock
+
+
+def salvar_sessao(sessao_id: str, historico: List[Dict]):
+    historico = limitar_historico(historico, MAX_MENSAGENS_SESSAO)
+    sessoes.salvar(sessao_id, compactar_historico(historico, MAX_TOKENS_SESSAO))
+
+
+def montar_system_prompt() -> str:
+    return f"""
     Você é um agente inteligente que responde dúvidas sobre a folha de pagamento de um colaborador individual.
     Nunca fale sobre dados de outros colaboradores ou sobre valores médios da empresa.
     Sempre responda com base apenas nos dados do colaborador atual.
     Caso sejam perguntas totalmente desconexas com o assunto de folha de pagamento, responda com "Desculpe, mas o assunto da pergunta está fora do meu escopo de atuação.".
     Responda apenas assuntos relacionados a folha de pagamento, e evite respostas de assuntos desconexos.
     
-    Essas são as colunas disponíveis na folha de pagamento: {', '.join(cabecalho)}.
+    Essas são as colunas disponíveis na folha de pagamento: {', '.join(dados_folha.cabecalho)}.
     Ao usar funções que exigem o nome de uma coluna, use **exatamente** os nomes listados acima. Não traduza nem reescreva os nomes das colunas.
 
     Você pode consultar documentos PDF e textos técnicos (como explicações sobre FGTS, PIS, IRRF, CBO etc) que foram carregados na base vetorial.
@@ -88,50 +158,104 @@ def conversar(pergunta: Pergunta):
     - Se a pergunta do usuário for conceitual (como “o que é FGTS?” ou “como funciona o IRRF?”), **responda de forma completa, clara e explicativa**, utilizando os documentos e seu conhecimento se necessário.
     """
 
-    if not chat_history:
-        chat_history.append({"role": "system", "content": system_prompt})
 
-    chat_history.append({"role": "user", "content": pergunta.mensagem})
+def iniciar_turno(historico: List[Dict], pergunta: Pergunta):
+    if not historico:
+        historico.append({"role": "system", "content": montar_system_prompt()})
+    historico.append({"role": "user", "content": pergunta.mensagem})
+
+
+def preparar_chamadas(pares: List[tuple]):
+    """
+    Converte pares (nome, argumentos JSON) do modelo em chamadas executáveis.
+    Retorna (validas, resultados): validas = [(índice, nome, args)] e
+    resultados já preenchido com o erro das chamadas com JSON inválido.
+    """
+    resultados: List[Any] = [None] * len(pares)
+    validas = []
+    for i, (nome, argumentos) in enumerate(pares):
+        try:
+            validas.append((i, nome, argumentos_do_modelo(json.loads(argumentos))))
+        except Exception as e:
+            resultados[i] = {"erro": str(e)}
+    return validas, resultados
+
+
+def mensagem_assistente(msg) -> Dict:
+    """Converte a mensagem do modelo em dict serializável para o histórico."""
+    mensagem = {"role": "assistant", "content": msg.content}
+    if msg.tool_calls:
+        mensagem["tool_calls"] = [
+            {"id": tc.id, "type": "function", "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+            for tc in msg.tool_calls
+        ]
+    return mensagem
+
+
+def registrar_resultado_tool(historico: List[Dict], tool_call_id: str, resultado: Any):
+    historico.append({
+        "role": "tool",
+        "tool_call_id": tool_call_id,
+        "content": json_bytes(resultado).decode("utf-8")
+    })
+
 
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini-2025-04-14",
-        messages=chat_history,
-        tools=tools,
+# ------------------------------------------------------------------
+# ENDPOINT /chat
+# ------------------------------------------------------------------
+@app.post("/chat")
+async def conversar(
+    pergunta: Pergunta,
+    x_sessao_id: Optional[str] = Header(None),
+    sessao_id: Optional[str] = Cookie(None),
+):
+    sessao = resolver_sessao(x_sessao_id, sessao_id)
+    async with lock_da_sessao(sessao):
+        historico = await asyncio.to_thread(sessoes.carregar, sessao)
+        resposta = await turno_chat(historico, pergunta)
+        # só grava turnos completos (tool_calls sempre acompanhadas das respostas)
+        await asyncio.to_thread(salvar_sessao, sessao, historico)
+    # a resposta é devolvida pronta: cabeçalho e cookie vão nela, não num Response injetado
+    resposta.headers[HEADER_SESSAO] = sessao
+    resposta.set_cookie(COOKIE_SESSAO, sessao, httponly=True, samesite="lax")
+    return resposta
+
+
+async def turno_chat(historico: List[Dict], pergunta: Pergunta):
+    iniciar_turno(historico, pergunta)
+
+    resp = await client.chat.completions.create(
+        model=MODELO,
+        messages=historico,
+        tools=selecionar_tools(pergunta.mensagem, historico),
     )
     assistant_msg = resp.choices[0].message
-    chat_history.append(assistant_msg)
+    historico.append(mensagem_assistente(assistant_msg))
 
     # ------------------------------------------------------------ #
     # Se o LLM chamou funções                                        #
     # ------------------------------------------------------------ #
     if assistant_msg.tool_calls:
-        insights_coletados = []
-
-        for tc in assistant_msg.tool_calls:
-            nome = tc.function.name
-            try:
-                args = json.loads(tc.function.arguments)
-                resultado = call_function(nome, args)
-            except Exception as e:
-                resultado = {"erro": str(e)}
-
-            chat_history.append({
-                "role": "tool",
-                "tool_call_id": tc.id,
-                "content": json.dumps(resultado, default=convert_numpy_types)
-            })
+        # executa as tools do turno concorrentemente, fora do event loop
+        validas, resultados = preparar_chamadas(
+            [(tc.function.name, tc.function.arguments) for tc in assistant_msg.tool_calls]
+        )
+        lote = await call_functions_async([(nome, args) for _, nome, args in validas], pergunta.colaborador)
+        for (i, _, _), resultado in zip(validas, lote):
+            resultados[i] = resultado
 
-            insights_coletados.append(resultado)
+        for tc, resultado in zip(assistant_msg.tool_calls, resultados):
+            registrar_resultado_tool(historico, tc.id, resultado)
 
         # Gera resposta final após a execução das funções
-        final_resp = client.chat.completions.create(
-            model="gpt-4.1-mini-2025-04-14",
-            messages=chat_history
+        final_resp = await client.chat.completions.create(
+            model=MODELO,
+            messages=historico
         )
         final_text = final_resp.choices[0].message.content
-        chat_history.append({"role": "assistant", "content": final_text})
+        historico.append({"role": "assistant", "content": final_text})
 
-        return safe_response({"resposta": final_text, "insights": insights_coletados})
+        return safe_response({"resposta": final_text, "insights": resultados})
 
     # ------------------------------------------------------------ #
     # Caso não haja function_call                                    #
@@ -139,63 +263,332 @@ def conversar(pergunta: Pergunta):
     return safe_response({"resposta": assistant_msg.content})
 
 
+# ------------------------------------------------------------------
+# ENDPOINT /chat/stream – mesma conversa, entregue via SSE
+#   event: token       → {"conteudo": trecho da resposta}
+#   event: ferramenta  → {"id", "nome"} quando uma tool é disparada
+#   event: insight     → {"id", "nome", "resultado"} assim que a tool retorna
+#   event: fim         → {"resposta": texto completo}
+#   event: erro        → {"detalhe": mensagem}
+# ------------------------------------------------------------------
+def evento_sse(evento: str, dados: Any) -> str:
+    return f"event: {evento}\ndata: {json_bytes(dados).decode('utf-8')}\n\n"
+
+
+async def eventos_chat(sessao: str, pergunta: Pergunta):
+    async with lock_da_sessao(sessao):
+        historico = await asyncio.to_thread(sessoes.carregar, sessao)
+        concluido = False
+        async for evento in eventos_turno(historico, pergunta):
+            concluido = evento.startswith("event: fim")
+            yield evento
+        # só grava turnos completos (tool_calls sempre acompanhadas das respostas)
+        if concluido:
+            await asyncio.to_thread(salvar_sessao, sessao, historico)
+
+
+async def eventos_turno(historico: List[Dict], pergunta: Pergunta):
+    try:
+        iniciar_turno(historico, pergunta)
+        stream = await client.chat.completions.create(
+            model=MODELO,
+            messages=historico,
+            tools=selecionar_tools(pergunta.mensagem, historico),
+            stream=True,
+        )
+
+        # acumula o texto e as tool_calls que chegam fragmentadas nos deltas
+        texto, parciais = "", {}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                texto += delta.content
+                yield evento_sse("token", {"conteudo": delta.content})
+            for tc in delta.tool_calls or []:
+                atual = parciais.setdefault(tc.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+                if tc.id:
+                    atual["id"] = tc.id
+                if tc.function and tc.function.name:
+                    atual["function"]["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    atual["function"]["arguments"] += tc.function.arguments
+
+        if not parciais:
+            historico.append({"role": "assistant", "content": texto})
+            yield evento_sse("fim", {"resposta": texto})
+            return
+
+        tool_calls = [parciais[k] for k in sorted(parciais)]
+        historico.append({"role": "assistant", "content": texto or None, "tool_calls": tool_calls})
+        for tc in tool_calls:
+            yield evento_sse("ferramenta", {"id": tc["id"], "nome": tc["function"]["name"]})
+
+        validas, resultados = preparar_chamadas(
+            [(tc["function"]["name"], tc["function"]["arguments"]) for tc in tool_calls]
+        )
+        for i, resultado in enumerate(resultados):
+            if resultado is not None:
+                yield evento_sse("insight", {"id": tool_calls[i]["id"], "nome": tool_calls[i]["function"]["name"], "resultado": resultado})
+        async for j, resultado in iter_functions_async([(nome, args) for _, nome, args in validas], pergunta.colaborador):
+            i = validas[j][0]
+            resultados[i] = resultado
+            yield evento_sse("insight", {"id": tool_calls[i]["id"], "nome": tool_calls[i]["function"]["name"], "resultado": resultado})
+
+        for tc, resultado in zip(tool_calls, resultados):
+            registrar_resultado_tool(historico, tc["id"], resultado)
+
+        final = await client.chat.completions.create(
+            model=MODELO,
+            messages=historico,
+            stream=True,
+        )
+        resposta = ""
+        async for chunk in final:
+            if chunk.choices and chunk.choices[0].delta.content:
+                resposta += chunk.choices[0].delta.content
+                yield evento_sse("token", {"conteudo": chunk.choices[0].delta.content})
+        historico.append({"role": "assistant", "content": resposta})
+        yield evento_sse("fim", {"resposta": resposta})
+
+    except Exception as e:
+        yield evento_sse("erro", {"detalhe": str(e)})
+
+
+@app.post("/chat/stream")
+async def conversar_stream(
+    pergunta: Pergunta,
+    x_sessao_id: Optional[str] = Header(None),
+    sessao_id: Optional[str] = Cookie(None),
+):
+    sessao = resolver_sessao(x_sessao_id, sessao_id)
+    resposta = StreamingResponse(
+        eventos_chat(sessao, pergunta),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", HEADER_SESSAO: sessao},
+    )
+    resposta.set_cookie(COOKIE_SESSAO, sessao, httponly=True, samesite="lax")
+    return resposta
+
+
+# ------------------------------------------------------------------
+# ENDPOINT DELETE /chat – encerra a conversa da sessão
+# ------------------------------------------------------------------
+@app.delete("/chat")
+def encerrar_conversa(
+    x_sessao_id: Optional[str] = Header(None),
+    sessao_id: Optional[str] = Cookie(None),
+):
+    sessao = x_sessao_id or sessao_id
+    if sessao:
+        sessoes.remover(sessao)
+    return {"sessao": sessao, "removida": bool(sessao)}
+
+
 # ------------------------------------------------------------------
 # ENDPOINT /chamar – executa função diretamente
 # ------------------------------------------------------------------
 @app.post("/chamar")
 def chamar_funcao(req: Chamada):
     try:
-        resultado = call_function(req.nome, req.argumentos)
+        resultado = call_function(req.nome, req.argumentos, req.colaborador)
         return safe_response(resultado)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ------------------------------------------------------------------
-# ENDPOINT /grafico – gera imagens base64 a partir dos insights
+# ENDPOINT /chamar/lote – executa várias funções de uma vez
+# ------------------------------------------------------------------
+@app.post("/chamar/lote")
+def chamar_lote(req: Lote):
+    chamadas = [(c.nome, c.argumentos, c.colaborador) for c in req.chamadas]
+    resultados = call_functions_lote(chamadas, req.colaborador)
+    return safe_response({"resultados": resultados})
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /grafico – especificação dos gráficos ou imagem binária
+# JSON (padrão): insights + especificações Plotly, desenhadas pelo cliente.
+# Accept: image/png | image/svg+xml | image/webp: imagem do insight
+# `indice`, renderizada no servidor (pool de processos + cache).
 # ------------------------------------------------------------------
 @app.post("/grafico")
-def gerar_grafico(req: Chamada):
+def gerar_grafico(req: Chamada, accept: Optional[str] = Header(None), indice: int = 0,
+                  largura: int = graficos.LARGURA_PADRAO, altura: int = graficos.ALTURA_PADRAO):
     try:
-        insight_dict = call_function(req.nome, req.argumentos)
+        insight_dict = call_function(req.nome, req.argumentos, req.colaborador)
         if "insights" not in insight_dict:
             raise ValueError("Nenhum insight retornado.")
-
-        imagens = []
-        for ins in insight_dict["insights"]:
-            plt.figure(figsize=(8, 4))
-            tipo = ins["tipo"]
-            if tipo == "linha":
-                plt.plot(ins["eixo_x"], ins["dados"], marker="o")
-                plt.ylabel(ins["eixo_y"])
-            elif tipo == "barra":
-                plt.bar(ins["eixo_x"], ins["dados"])
-                plt.ylabel(ins["eixo_y"])
-            elif tipo == "pizza":
-                labels = [d["label"] for d in ins["dados"]]
-                vals = [d["value"] for d in ins["dados"]]
-                plt.pie(vals, labels=labels, autopct="%1.1f%%")
-            plt.title(ins["titulo"])
-            if tipo != "pizza":
-                plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            buf = io.BytesIO()
-            plt.savefig(buf, format="png")
-            plt.close()
-            imagens.append(base64.b64encode(buf.getvalue()).decode())
-
-        payload = {"insights": insight_dict["insights"], "imagens_base64": imagens}
-        return safe_response(payload)
+        insights = insight_dict["insights"]
+
+        formato = graficos.negociar_formato(accept)
+        if formato is None:
+            return safe_response({"insights": insights, "specs": [graficos.spec_plotly(i) for i in insights]})
+
+        if not 0 <= indice < len(insights):
+            raise ValueError(f"Índice {indice} inválido: há {len(insights)} insight(s).")
+        imagem = graficos.renderizar_lote([insights[indice]], formato, largura, altura)[0]
+        return Response(
+            content=imagem,
+            media_type=graficos.FORMATOS[formato],
+            headers={"X-Total-Insights": str(len(insights))},
+        )
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 # ------------------------------------------------------------------
-# ENDPOINT /dados – devolve o holerite completo
+# ENDPOINT /dados – registros da folha
+# Sem parâmetros devolve todos os registros (lista de objetos). Aceita
+# projeção de colunas, filtro por colaborador e período, paginação por
+# cursor (X-Proximo-Cursor) e os formatos split (colunar) e arrow.
+# A resposta é comprimida (br/gzip) conforme o Accept-Encoding.
 # ------------------------------------------------------------------
+MAX_LIMITE_DADOS = 10000
+MIN_BYTES_COMPRESSAO = 1024
+
+
+def negociar_codificacao(accept_encoding: Optional[str]) -> Optional[str]:
+    aceitas = set()
+    for item in (accept_encoding or "").lower().split(","):
+        partes = [p.strip() for p in item.split(";")]
+        if partes[0] and "q=0" not in partes[1:]:
+            aceitas.add(partes[0])
+    if "br" in aceitas:
+        try:
+            import brotli  # noqa: F401
+            return "br"
+        except ImportError:
+            pass
+    return "gzip" if "gzip" in aceitas else None
+
+
+def comprimir(conteudo: bytes, codificacao: Optional[str]) -> bytes:
+    if codificacao == "br":
+        import brotli
+        return brotli.compress(conteudo, quality=5)
+    if codificacao == "gzip":
+        return gzip.compress(conteudo, compresslevel=6)
+    return conteudo
+
+
+def gerar_cursor(inicio: int) -> str:
+    return base64.urlsafe_b64encode(f"{dados_folha.versao}:{inicio}".encode()).decode()
+
+
+def ler_cursor(cursor: str) -> int:
+    try:
+        versao, inicio = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        versao, inicio = int(versao), int(inicio)
+    except ValueError:
+        raise ValueError("Cursor inválido.")
+    if inicio < 0:
+        raise ValueError("Cursor inválido.")
+    if versao != dados_folha.versao:
+        raise ValueError("Cursor expirado: a folha foi recarregada. Recomece a paginação.")
+    return inicio
+
+
+@lru_cache(maxsize=32)
+def dados_serializados(versao: int, colunas: tuple, colaborador: Optional[str], periodo: Optional[tuple],
+                       inicio: int, limite: Optional[int], formato: str, codificacao: Optional[str]) -> tuple:
+    """(conteúdo já comprimido, total de linhas) — `versao` invalida o cache quando a folha é recarregada."""
+    if not (colunas or colaborador or periodo or inicio or limite) and formato == "records":
+        conteudo, total = registros_json(), len(dados_folha.df)
+    else:
+        sel = dados_folha.selecionar_registros(colunas, colaborador, periodo)
+        total = len(sel)
+        pagina = sel.iloc[inicio:inicio + limite] if limite else sel.iloc[inicio:]
+        conteudo = dados_folha.serializar_registros(pagina, formato)
+    if len(conteudo) < MIN_BYTES_COMPRESSAO:
+        codificacao = None
+    return comprimir(conteudo, codificacao), total, codificacao
+
+
 @app.get("/dados")
-def get_dados():
-    registros = df.to_dict(orient="records")
-    return safe_response(registros)
+def get_dados(colunas: Optional[str] = None, colaborador: Optional[str] = None,
+              mes_inicial: Optional[str] = None, ano_inicial: Optional[int] = None,
+              mes_final: Optional[str] = None, ano_final: Optional[int] = None,
+              limite: Optional[int] = None, cursor: Optional[str] = None, formato: str = "records",
+              accept_encoding: Optional[str] = Header(None)):
+    try:
+        if formato not in dados_folha.FORMATOS_REGISTROS:
+            raise ValueError(f"Formato '{formato}' inválido. Use: {', '.join(dados_folha.FORMATOS_REGISTROS)}.")
+        if limite is not None and not 1 <= limite <= MAX_LIMITE_DADOS:
+            raise ValueError(f"O limite deve estar entre 1 e {MAX_LIMITE_DADOS}.")
+        periodo = None
+        if any(v is not None for v in (mes_inicial, ano_inicial, mes_final, ano_final)):
+            if ano_inicial is None or ano_final is None:
+                raise ValueError("Informe ano_inicial e ano_final para filtrar por período.")
+            periodo = (
+                dados_folha.numero_mes(mes_inicial or 1), ano_inicial,
+                dados_folha.numero_mes(mes_final or 12), ano_final,
+            )
+        selecao = tuple(c.strip() for c in colunas.split(",") if c.strip()) if colunas else ()
+        inicio = ler_cursor(cursor) if cursor else 0
+
+        conteudo, total, codificacao = dados_serializados(
+            dados_folha.versao, selecao, colaborador, periodo, inicio, limite, formato,
+            negociar_codificacao(accept_encoding),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Total-Linhas": str(total), "Vary": "Accept-Encoding"}
+    if limite and inicio + limite < total:
+        headers["X-Proximo-Cursor"] = gerar_cursor(inicio + limite)
+    if codificacao:
+        headers["Content-Encoding"] = codificacao
+    return Response(content=conteudo, media_type=dados_folha.FORMATOS_REGISTROS[formato], headers=headers)
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /health – verificação barata de que a API está no ar
+# ------------------------------------------------------------------
+@app.get("/health")
+def health():
+    return {"status": "ok", "versao": dados_folha.versao, "linhas": len(dados_folha.df)}
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /dados/recarregar – relê o CSV e invalida os caches
+# ------------------------------------------------------------------
+@app.post("/dados/recarregar")
+def recarregar_dados():
+    dados_folha.recarregar()
+    return {"versao": dados_folha.versao, "linhas": len(dados_folha.df)}
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /cache – estatísticas do cache de resultados das tools
+# ------------------------------------------------------------------
+@app.get("/cache")
+def estatisticas_cache():
+    return cache_resultados.estatisticas()
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /cache/rag – estatísticas dos dois níveis do cache do RAG
+# ------------------------------------------------------------------
+@app.get("/cache/rag")
+def estatisticas_cache_rag():
+    return obter_cache().estatisticas()
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /cache/graficos – estatísticas do cache de imagens do /grafico
+# ------------------------------------------------------------------
+@app.get("/cache/graficos")
+def estatisticas_cache_graficos():
+    return graficos.cache_graficos.estatisticas()
+
+
+# ------------------------------------------------------------------
+# ENDPOINT /tools/estatisticas – chamadas, erros e tempo médio por tool
+# ------------------------------------------------------------------
+@app.get("/tools/estatisticas")
+def estatisticas_ferramentas():
+    return estatisticas_tools()
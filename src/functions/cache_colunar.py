@@ -0,0 +1,207 @@
+"""
+Cache colunar binário do Dados.csv.
+
+O CSV é convertido uma única vez em arquivos NumPy (.npy), um por coluna:
+meses como inteiros, colunas numéricas em int64/float64 e colunas de texto
+como códigos categóricos. Na inicialização os arquivos são abertos com
+memory-map; o cache só é reconstruído quando o CSV muda (mtime/tamanho e,
+em caso de dúvida, hash SHA-256).
+
+Reconstrução manual (a partir de src/):
+    python -m functions.cache_colunar
+"""
+import hashlib
+import json
+import os
+import unicodedata
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MESES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro",
+]
+mes_map = {mes: i + 1 for i, mes in enumerate(MESES)}
+
+
+def _chave_mes(texto: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return sem_acento.strip().casefold()
+
+
+_meses_normalizados = {_chave_mes(mes): numero for mes, numero in mes_map.items()}
+
+
+def mes_numerico(mes) -> Optional[int]:
+    """Mês por número ("5") ou por extenso, sem diferenciar caixa, acentos e espaços; None se inválido."""
+    if isinstance(mes, float) and mes.is_integer():
+        mes = int(mes)
+    texto = str(mes).strip()
+    if texto.isdigit():
+        return int(texto) if 1 <= int(texto) <= 12 else None
+    return _meses_normalizados.get(_chave_mes(texto))
+
+
+VERSAO_FORMATO = 1
+ARQUIVO_META = "meta.json"
+
+
+def _dir_cache(csv_path: str) -> str:
+    pasta, nome = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(pasta, ".cache", os.path.splitext(nome)[0])
+
+
+def _hash_arquivo(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_meta(cache_dir: str):
+    try:
+        with open(os.path.join(cache_dir, ARQUIVO_META), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("versao") == VERSAO_FORMATO else None
+
+
+def _gravar_meta(cache_dir: str, meta: dict):
+    tmp = os.path.join(cache_dir, f"{ARQUIVO_META}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(cache_dir, ARQUIVO_META))
+
+
+def _gravar_array(cache_dir: str, arquivo: str, valores: np.ndarray):
+    """
+    Grava num temporário e troca de uma vez: um processo que já tenha o
+    arquivo anterior em memory-map continua lendo o conteúdo antigo.
+    """
+    tmp = os.path.join(cache_dir, f"{arquivo}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, valores)
+    os.replace(tmp, os.path.join(cache_dir, arquivo))
+
+
+def _tipar_periodo(df: pd.DataFrame, csv_path: str) -> pd.DataFrame:
+    """Mês e Ano como inteiros; linhas com mês ou ano inválido são descartadas com aviso."""
+    meses = df["Mês"].map({valor: mes_numerico(valor) for valor in df["Mês"].unique()})
+    anos = pd.to_numeric(df["Ano"], errors="coerce")
+    invalidas = meses.isna() | anos.isna()
+    if invalidas.any():
+        linhas = (np.flatnonzero(invalidas.to_numpy()) + 2).tolist()   # linha 1 é o cabeçalho
+        exemplos = ", ".join(map(str, linhas[:10])) + (" ..." if len(linhas) > 10 else "")
+        print(f"AVISO: {len(linhas)} linha(s) de {csv_path} ignorada(s) por mês ou ano inválido: {exemplos}")
+    df = df[~invalidas].reset_index(drop=True)
+    df["Mês"] = meses[~invalidas].to_numpy(dtype="int64")
+    df["Ano"] = anos[~invalidas].to_numpy(dtype="int64")
+    return df
+
+
+def construir_cache(csv_path: str) -> dict:
+    """Lê o CSV, tipa as colunas e grava o cache colunar ordenado por período."""
+    cache_dir = _dir_cache(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(csv_path)
+    sha = _hash_arquivo(csv_path)
+
+    df = _tipar_periodo(pd.read_csv(csv_path), csv_path)
+    periodo = df["Ano"].to_numpy() * 12 + df["Mês"].to_numpy()
+    ordem = np.argsort(periodo, kind="stable")
+    df = df.iloc[ordem].reset_index(drop=True)
+
+    # arquivos versionados pelo hash: leitores antigos continuam válidos até o fim
+    prefixo = sha[:12]
+    colunas = []
+    for i, nome in enumerate(df.columns):
+        serie = df[nome]
+        arquivo = f"{prefixo}_{i}.npy"
+        if pd.api.types.is_integer_dtype(serie):
+            _gravar_array(cache_dir, arquivo, serie.to_numpy(dtype="int64"))
+            colunas.append({"nome": nome, "tipo": "int64", "arquivo": arquivo})
+        elif pd.api.types.is_numeric_dtype(serie):
+            _gravar_array(cache_dir, arquivo, serie.to_numpy(dtype="float64"))
+            colunas.append({"nome": nome, "tipo": "float64", "arquivo": arquivo})
+        else:
+            cat = pd.Categorical(serie.astype("string"))
+            _gravar_array(cache_dir, arquivo, cat.codes.astype("int32"))
+            colunas.append({
+                "nome": nome,
+                "tipo": "categoria",
+                "arquivo": arquivo,
+                "categorias": [str(c) for c in cat.categories],
+            })
+    arquivo_periodo = f"{prefixo}_periodo.npy"
+    _gravar_array(cache_dir, arquivo_periodo, periodo[ordem])
+
+    meta = {
+        "versao": VERSAO_FORMATO,
+        "csv_sha256": sha,
+        "csv_mtime_ns": stat.st_mtime_ns,
+        "csv_tamanho": stat.st_size,
+        "linhas": len(df),
+        "colunas": colunas,
+        "periodo": arquivo_periodo,
+    }
+    _gravar_meta(cache_dir, meta)
+
+    # remove arquivos de versões anteriores
+    for antigo in os.listdir(cache_dir):
+        if antigo.endswith(".npy") and not antigo.startswith(prefixo + "_"):
+            try:
+                os.remove(os.path.join(cache_dir, antigo))
+            except OSError:
+                pass
+    return meta
+
+
+def _meta_valida(csv_path: str):
+    """Retorna o meta do cache se ele corresponder ao CSV atual, senão None."""
+    cache_dir = _dir_cache(csv_path)
+    meta = _ler_meta(cache_dir)
+    if meta is None:
+        return None
+    stat = os.stat(csv_path)
+    if meta["csv_mtime_ns"] == stat.st_mtime_ns and meta["csv_tamanho"] == stat.st_size:
+        return meta
+    # mtime mudou (ex.: checkout); confirma pelo conteúdo antes de reconstruir
+    if meta["csv_tamanho"] == stat.st_size and meta["csv_sha256"] == _hash_arquivo(csv_path):
+        meta["csv_mtime_ns"] = stat.st_mtime_ns
+        _gravar_meta(cache_dir, meta)
+        return meta
+    return None
+
+
+def carregar_folha(csv_path: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Retorna (df, chaves_periodo) a partir do cache colunar, reconstruindo-o
+    se necessário. As linhas vêm ordenadas por período, com "Mês" numérico,
+    e os arrays são abertos com memory-map (somente leitura).
+    """
+    meta = _meta_valida(csv_path)
+    if meta is None:
+        meta = construir_cache(csv_path)
+    cache_dir = _dir_cache(csv_path)
+
+    def abrir(arquivo):
+        return np.load(os.path.join(cache_dir, arquivo), mmap_mode="r")
+
+    dados = {}
+    for col in meta["colunas"]:
+        valores = abrir(col["arquivo"])
+        if col["tipo"] == "categoria":
+            valores = pd.Categorical.from_codes(valores, categories=col["categorias"])
+        dados[col["nome"]] = valores
+    df = pd.DataFrame(dados, copy=False)
+    return df, abrir(meta["periodo"])
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    meta = construir_cache(os.path.join(base_dir, "data", "Dados.csv"))
+    print(f"Cache colunar criado: {meta['linhas']} linhas, {len(meta['colunas'])} colunas.")
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from .cache_colunar import carregar_folha, mes_numerico, MESES
+from .folha_store import FolhaStore
+
+# ------------------------------------------------------------------
+# Fonte única da folha de pagamento no processo (API, agente e tools)
+# ------------------------------------------------------------------
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+csv_path = os.path.join(base_dir, "data", "Dados.csv")
+
+# Meses numéricos e linhas ordenadas por período (ver cache_colunar)
+df, chaves_periodo = carregar_folha(csv_path)
+cabecalho = df.columns.tolist()
+
+# Índice cronológico por período e por colaborador
+store = FolhaStore(df, chaves=chaves_periodo)
+
+# Incrementada a cada recarga; usada para invalidar caches derivados da folha
+versao = 0
+
+
+def recarregar():
+    """Relê a folha (via cache colunar) e invalida os dados derivados."""
+    global df, chaves_periodo, cabecalho, store, versao
+    novo_df, novas_chaves = carregar_folha(csv_path)
+    novo_store = FolhaStore(novo_df, chaves=novas_chaves)
+    df, chaves_periodo, cabecalho, store = novo_df, novas_chaves, novo_df.columns.tolist(), novo_store
+    registros_json.cache_clear()
+    versao += 1
+
+
+def registros_df() -> pd.DataFrame:
+    """Visão de registros como no CSV original (mês por extenso)."""
+    view = df.copy(deep=False)
+    view["Mês"] = pd.Categorical.from_codes(df["Mês"].to_numpy() - 1, categories=MESES)
+    return view
+
+
+@lru_cache(maxsize=1)
+def registros_json() -> bytes:
+    """Serialização JSON de todos os registros, calculada uma única vez."""
+    registros = registros_df().to_dict(orient="records")
+    return json.dumps(registros, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# ------------------------------------------------------------------
+# Consultas do /dados: projeção, filtros e serialização compacta
+# ------------------------------------------------------------------
+FORMATOS_REGISTROS = {
+    "records": "application/json",                       # lista de objetos (formato original)
+    "split": "application/json",                         # {"columns": [...], "data": [[...], ...]}
+    "arrow": "application/vnd.apache.arrow.stream",      # Arrow IPC (requer pyarrow)
+}
+
+
+def erro_colaborador(colaborador: Optional[str]) -> str:
+    """Motivo de store.colaborador(colaborador) não devolver uma folha."""
+    if colaborador is None or str(colaborador).strip() == "":
+        return (f"A folha tem {len(store.particoes)} colaboradores: a consulta precisa do colaborador "
+                "(e-mail ou PIS) informado pela aplicação.")
+    return f"Colaborador '{colaborador}' não encontrado."
+
+
+def numero_mes(mes) -> int:
+    """Mês por número ("5") ou por extenso ("Maio")."""
+    numero = mes_numerico(mes)
+    if numero is None:
+        raise ValueError(f"Mês '{mes}' inválido.")
+    return numero
+
+
+def selecionar_registros(colunas: Optional[Sequence[str]] = None, colaborador: Optional[str] = None,
+                         periodo: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Registros do colaborador (todos, sem colaborador) no período
+    (mes_inicial, ano_inicial, mes_final, ano_final), só com as colunas
+    pedidas e o mês por extenso, em ordem cronológica.
+    """
+    folha = store if colaborador is None else store.colaborador(colaborador)
+    if folha is None:
+        raise ValueError(erro_colaborador(colaborador))
+    sel = folha.periodo(*periodo) if periodo else folha.tudo()
+    if colunas:
+        desconhecidas = [c for c in colunas if c not in sel.columns]
+        if desconhecidas:
+            raise ValueError(f"Coluna(s) inexistente(s): {', '.join(desconhecidas)}.")
+        sel = sel[list(colunas)]
+    if "Mês" in sel.columns:
+        sel = sel.assign(**{"Mês": pd.Categorical.from_codes(sel["Mês"].to_numpy() - 1, categories=MESES)})
+    return sel
+
+
+def serializar_registros(sel: pd.DataFrame, formato: str = "records") -> bytes:
+    if formato == "records":
+        return sel.to_json(orient="records", force_ascii=False, double_precision=15).encode("utf-8")
+    if formato == "split":
+        return sel.to_json(orient="split", index=False, force_ascii=False, double_precision=15).encode("utf-8")
+    if formato == "arrow":
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError("Formato 'arrow' indisponível: instale o pacote pyarrow.")
+        tabela = pa.Table.from_pandas(sel, preserve_index=False)
+        buf = io.BytesIO()
+        with pa.ipc.new_stream(buf, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return buf.getvalue()
+    raise ValueError(f"Formato '{formato}' inválido. Use: {', '.join(FORMATOS_REGISTROS)}.")
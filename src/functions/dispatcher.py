@@ -1,56 +1,270 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import dados_folha
 from .folha_tools import *
+from .registro_tools import FERRAMENTAS, estatisticas_tools
+
+
+# Funções que não operam sobre a folha de um colaborador
+FUNCOES_SEM_COLABORADOR = {nome for nome, item in FERRAMENTAS.items() if not item.colaborador}
+
+# Funções cujo resultado não depende só dos argumentos e da folha
+FUNCOES_SEM_CACHE = {nome for nome, item in FERRAMENTAS.items() if not item.cache}
+
+
+class CacheResultados:
+    """
+    Cache LRU com TTL dos resultados das tools, chaveado por
+    (nome, argumentos canônicos, versão da folha). Quando a folha é
+    recarregada a versão muda e o cache é esvaziado automaticamente.
+    Os resultados guardados são compartilhados: trate-os como somente leitura.
+    """
+
+    def __init__(self, max_itens: int = 512, ttl: float = 600.0):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._itens: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+        self._versao = dados_folha.versao
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(name: str, arguments: dict) -> Optional[tuple]:
+        """Chave canônica da chamada, ou None se ela não for cacheável."""
+        if name in FUNCOES_SEM_CACHE or not isinstance(arguments, dict):
+            return None
+        canonicos = {k: v for k, v in arguments.items() if v is not None}
+        return name, json.dumps(canonicos, sort_keys=True, ensure_ascii=False, default=str), dados_folha.versao
+
+    def _verifica_versao(self):
+        if self._versao != dados_folha.versao:
+            self._itens.clear()
+            self._versao = dados_folha.versao
+
+    def obter(self, chave: tuple) -> Optional[dict]:
+        with self._lock:
+            self._verifica_versao()
+            item = self._itens.get(chave)
+            if item is None or time.monotonic() - item[0] > self.ttl:
+                if item is not None:
+                    del self._itens[chave]
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[1]
+
+    def guardar(self, chave: tuple, resultado: dict):
+        if not isinstance(resultado, dict) or resultado.get("erro"):
+            return
+        with self._lock:
+            self._verifica_versao()
+            self._itens[chave] = (time.monotonic(), resultado)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+cache_resultados = CacheResultados(
+    max_itens=int(os.getenv("CACHE_RESULTADOS_MAX", "512")),
+    ttl=float(os.getenv("CACHE_RESULTADOS_TTL", "600")),
+)
+
+
+def argumentos_do_modelo(arguments: Any) -> Any:
+    """Argumentos vindos do modelo: o colaborador nunca é escolhido por ele (ver registro_tools)."""
+    if isinstance(arguments, dict) and "colaborador" in arguments:
+        return {k: v for k, v in arguments.items() if k != "colaborador"}
+    return arguments
+
+
+def _com_colaborador(name: str, arguments: dict, colaborador: Optional[str]) -> dict:
+    if colaborador is not None and name not in FUNCOES_SEM_COLABORADOR:
+        return {**arguments, "colaborador": colaborador}
+    return arguments
+
+
+def _traduzir_alias(name: str, arguments: dict) -> Tuple[str, dict]:
+    """
+    Os nomes antigos das tools de série (get_Media, get_Total_Periodo, ...)
+    são aliases finos de consultar_serie. Chamadas sem os argumentos
+    obrigatórios ficam com o nome antigo e viram erro em _executar.
+    """
+    if name not in FUNCOES_SERIE or not isinstance(arguments, dict):
+        return name, arguments
+    agregacao, variante = FUNCOES_SERIE[name]
+    try:
+        novos = {"colunas": [arguments["coluna"]], "agregacoes": [agregacao]}
+        if variante == "periodo":
+            novos["periodo"] = {k: arguments[k] for k in ARGS_PERIODO}
+        elif variante == "ultimos":
+            novos["ultimos_n"] = arguments["meses"]
+    except KeyError:
+        return name, arguments
+    if arguments.get("colaborador") is not None:
+        novos["colaborador"] = arguments["colaborador"]
+    return "consultar_serie", novos
+
+
+def _preparar(name: str, arguments: dict, colaborador: Optional[str]) -> Tuple[str, dict]:
+    return _traduzir_alias(name, _com_colaborador(name, arguments, colaborador))
+
+
+def call_functions_lote(chamadas: List[tuple], colaborador: Optional[str] = None) -> List[dict]:
+    """
+    Executa várias chamadas de uma vez, devolvendo os resultados na mesma ordem.
+    Cada chamada é (nome, argumentos) ou (nome, argumentos, colaborador); o
+    colaborador da chamada prevalece e `colaborador` vale para as demais.
+    Resultados já em cache são reaproveitados; chamadas de consultar_serie
+    (e de seus aliases) que compartilham colaborador e período são calculadas
+    juntas sobre uma única fatia; as demais seguem pelo caminho normal.
+    """
+    chamadas = [
+        _preparar(c[0], c[1], c[2] if len(c) > 2 and c[2] is not None else colaborador) for c in chamadas
+    ]
+    resultados: List[Optional[dict]] = [None] * len(chamadas)
+    chaves: Dict[int, tuple] = {}
+    pendentes = []
+    for i, (name, arguments) in enumerate(chamadas):
+        chave = CacheResultados.chave(name, arguments)
+        if chave is not None:
+            chaves[i] = chave
+            resultados[i] = cache_resultados.obter(chave)
+        if resultados[i] is None:
+            pendentes.append(i)
+
+    # consultar_serie: argumentos validados pelo registro e cálculo em lote
+    serie = FERRAMENTAS["consultar_serie"]
+    validas = []
+    for i in pendentes:
+        if chamadas[i][0] == serie.nome:
+            try:
+                validas.append((i, serie.validar(chamadas[i][1])))
+            except ValueError as e:
+                resultados[i] = {"erro": str(e)}
+    if validas:
+        inicio = time.perf_counter()
+        try:
+            lote = executar_lote_series([(serie.nome, arguments) for _, arguments in validas])
+        except Exception:
+            lote = [None] * len(validas)
+        duracao = (time.perf_counter() - inicio) / len(validas)
+        for (i, _), resultado in zip(validas, lote):
+            if resultado is not None:
+                serie.registrar(duracao, resultado)
+                resultados[i] = resultado
+
+    for i in pendentes:
+        if resultados[i] is None:
+            resultados[i] = _executar(*chamadas[i])
+        if i in chaves:
+            cache_resultados.guardar(chaves[i], resultados[i])
+    return resultados
+
+
+# Pool usado para executar tools sem bloquear o event loop da API
+executor_tools = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TOOLS_MAX_WORKERS", "8")),
+    thread_name_prefix="tools",
+)
+
+
+def _e_serie(name: str) -> bool:
+    return name == "consultar_serie" or name in FUNCOES_SERIE
+
+
+async def iter_functions_async(chamadas: List[Tuple[str, dict]], colaborador: Optional[str] = None):
+    """
+    Executa as chamadas sem bloquear o event loop e entrega pares
+    (índice, resultado) à medida que cada tarefa termina. As tools de série
+    seguem juntas em lote numa thread do pool; as demais (RAG, resumos, ...)
+    rodam concorrentemente, cada uma em sua thread.
+    """
+    loop = asyncio.get_running_loop()
+    serie = [i for i, (name, _) in enumerate(chamadas) if _e_serie(name)]
+    outras = [i for i, (name, _) in enumerate(chamadas) if not _e_serie(name)]
+
+    tarefas = {}
+    if serie:
+        futuro = loop.run_in_executor(
+            executor_tools, call_functions_lote, [chamadas[i] for i in serie], colaborador
+        )
+        tarefas[futuro] = serie
+    for i in outras:
+        name, arguments = chamadas[i]
+        tarefas[loop.run_in_executor(executor_tools, call_function, name, arguments, colaborador)] = i
+
+    pendentes = set(tarefas)
+    while pendentes:
+        prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+        for futuro in prontas:
+            indices = tarefas[futuro]
+            if isinstance(indices, list):
+                for i, resultado in zip(indices, futuro.result()):
+                    yield i, resultado
+            else:
+                yield indices, futuro.result()
+
+
+async def call_functions_async(chamadas: List[Tuple[str, dict]], colaborador: Optional[str] = None) -> List[dict]:
+    """Versão assíncrona de call_functions_lote (ver iter_functions_async)."""
+    resultados: List[Optional[dict]] = [None] * len(chamadas)
+    async for i, resultado in iter_functions_async(chamadas, colaborador):
+        resultados[i] = resultado
+    return resultados
+
+
+def call_function(name: str, arguments: dict, colaborador: Optional[str] = None) -> dict:
+    """
+    Executa a função `name` com `arguments`. Se `colaborador` for informado
+    (e-mail ou PIS), a consulta fica restrita à folha desse colaborador,
+    sobrescrevendo qualquer valor escolhido pelo modelo. Resultados são
+    memorizados em `cache_resultados` até a folha ser recarregada.
+    Nomes antigos das tools de série são atendidos por consultar_serie.
+    """
+    name, arguments = _preparar(name, arguments, colaborador)
+    chave = CacheResultados.chave(name, arguments)
+    if chave is None:
+        return _executar(name, arguments)
+    resultado = cache_resultados.obter(chave)
+    if resultado is None:
+        resultado = _executar(name, arguments)
+        cache_resultados.guardar(chave, resultado)
+    return resultado
 
 
-def call_function(name: str, arguments: dict) -> dict:
+def _executar(name: str, arguments: dict) -> dict:
+    item = FERRAMENTAS.get(name)
+    if item is None:
+        if name in FUNCOES_SERIE:
+            esperados = ("coluna",) + {"periodo": ARGS_PERIODO, "ultimos": ("meses",)}.get(FUNCOES_SERIE[name][1], ())
+            return {"erro": f"Argumentos esperados: {', '.join(esperados)}."}
+        return {"erro": f"Função '{name}' não implementada."}
     try:
-        match name:
-            case "consultar_documento_txt_ou_pdf":
-                return consultar_documento_txt_ou_pdf(**arguments)
-            case "get_informacoesCabecalho":
-                return get_informacoesCabecalho()
-            case "get_Media":
-                return get_Media(**arguments)
-            case "get_Media_Periodo":
-                return get_Media_Periodo(**arguments)
-            case "get_Media_Ultimo":
-                return get_Media_Ultimo(**arguments)
-            case "get_Maior":
-                return get_Maior(**arguments)
-            case "get_Maior_Periodo":
-                return get_Maior_Periodo(**arguments)
-            case "get_Maior_Ultimo":
-                return get_Maior_Ultimo(**arguments)
-            case "get_Menor":
-                return get_Menor(**arguments)
-            case "get_Menor_Periodo":
-                return get_Menor_Periodo(**arguments)
-            case "get_Menor_Ultimo":
-                return get_Menor_Ultimo(**arguments)
-            case "get_Total":
-                return get_Total(**arguments)
-            case "get_Total_Periodo":
-                return get_Total_Periodo(**arguments)
-            case "get_Total_Ultimo":
-                return get_Total_Ultimo(**arguments)
-            case "get_Evolucao":
-                return get_Evolucao(**arguments)
-            case "get_Evolucao_Periodo":
-                return get_Evolucao_Periodo(**arguments)
-            case "get_Mes_Ano":
-                return get_Mes_Ano(**arguments)
-            case "get_Crescimento_Percentual":
-                return get_Crescimento_Percentual(**arguments)
-            case "get_Crescimento_Percentual_Periodo":
-                return get_Crescimento_Percentual_Periodo(**arguments)
-            case "get_Resumo_Descontos_Periodo":
-                return get_Resumo_Descontos_Periodo(**arguments)
-            case "get_Resumo_Vencimentos_Periodo":
-                return get_Resumo_Vencimentos_Periodo(**arguments)
-            case "get_Resumo_Folha_Periodo":
-                return get_Resumo_Folha_Periodo(**arguments)
-            case "get_Participacao_Vencimentos":
-                return  get_Participacao_Vencimentos(**arguments)
-            case _:
-                return {"erro": f"Função '{name}' não implementada."}
+        return item.executar(arguments)
     except Exception as e:
         return {"erro": str(e)}
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+
+def chave_periodo(mes: int, ano: int) -> int:
+    """Converte mês/ano em uma chave inteira monotônica (ano*12 + mês)."""
+    return int(ano) * 12 + int(mes)
+
+
+def _normaliza_chave(chave) -> str:
+    """Normaliza e-mail (minúsculo) ou PIS (apenas dígitos) para busca do colaborador."""
+    if isinstance(chave, float) and chave.is_integer():
+        chave = int(chave)
+    texto = str(chave).strip().lower()
+    if "@" in texto:
+        return texto
+    digitos = "".join(c for c in texto if c.isdigit())
+    return digitos or texto
+
+
+class FolhaStore:
+    """
+    Armazena a folha ordenada cronologicamente e indexada pela chave de período
+    (ano*12 + mês). Consultas por período e pelos últimos N meses viram fatias
+    obtidas por busca binária, sem reordenar nem varrer o DataFrame inteiro.
+
+    Quando há coluna "Email", a folha também é particionada por colaborador:
+    cada partição é um FolhaStore próprio, acessado por e-mail ou PIS.
+    """
+
+    def __init__(self, df: pd.DataFrame, particionar: bool = True, chaves: Optional[np.ndarray] = None):
+        if chaves is None:
+            chaves = df["Ano"].to_numpy(dtype="int64") * 12 + df["Mês"].to_numpy(dtype="int64")
+        if len(chaves) < 2 or bool(np.all(chaves[1:] >= chaves[:-1])):
+            # já ordenado (ex.: vindo do cache colunar): evita copiar as linhas
+            self.df = df.reset_index(drop=True)
+            self.chaves = np.asarray(chaves)
+        else:
+            ordem = np.argsort(chaves, kind="stable")
+            self.df = df.iloc[ordem].reset_index(drop=True)
+            self.chaves = np.asarray(chaves)[ordem]
+
+        self.particoes: Dict[str, "FolhaStore"] = {}
+        self._aliases: Dict[str, str] = {}
+        if particionar and "Email" in self.df.columns:
+            self._particionar()
+
+    def _particionar(self):
+        grupos = self.df.groupby("Email", sort=False, observed=True).indices
+        for email, posicoes in grupos.items():
+            grupo = self.df.iloc[posicoes]
+            self.particoes[email] = FolhaStore(grupo, particionar=False, chaves=self.chaves[posicoes])
+            self._aliases[_normaliza_chave(email)] = email
+            if "PIS" in grupo.columns:
+                for pis in grupo["PIS"].dropna().unique():
+                    self._aliases.setdefault(_normaliza_chave(pis), email)
+
+    def colaborador(self, chave: Optional[str] = None) -> Optional["FolhaStore"]:
+        """
+        Retorna a partição do colaborador identificado por e-mail ou PIS.
+        Sem chave, retorna a folha inteira só se ela for de um único
+        colaborador; com vários, ou com chave desconhecida, retorna None.
+        """
+        if chave is None or str(chave).strip() == "":
+            return self if len(self.particoes) <= 1 else None
+        email = self._aliases.get(_normaliza_chave(chave))
+        return self.particoes.get(email) if email is not None else None
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.df.columns
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def tudo(self) -> pd.DataFrame:
+        """Retorna todas as linhas em ordem cronológica."""
+        return self.df
+
+    def periodo(self, mes_inicial: int, ano_inicial: int, mes_final: int, ano_final: int) -> pd.DataFrame:
+        """Retorna as linhas entre mes_inicial/ano_inicial e mes_final/ano_final (inclusive)."""
+        ini = np.searchsorted(self.chaves, chave_periodo(mes_inicial, ano_inicial), side="left")
+        fim = np.searchsorted(self.chaves, chave_periodo(mes_final, ano_final), side="right")
+        return self.df.iloc[ini:max(ini, fim)]
+
+    def mes_ano(self, mes: int, ano: int) -> pd.DataFrame:
+        """Retorna as linhas de um mês/ano específico."""
+        return self.periodo(mes, ano, mes, ano)
+
+    def ultimos(self, meses: int) -> pd.DataFrame:
+        """Retorna as últimas N linhas em ordem cronológica."""
+        if meses <= 0:
+            return self.df.iloc[0:0]
+        return self.df.iloc[-meses:]
@@ -1,43 +1,23 @@
 import os
+from functools import wraps
+
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from langchain_chroma import Chroma
-from langchain.chains import RetrievalQA
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-
-# Carrega variáveis de ambiente e dados
-load_dotenv()
 
-# Caminho absoluto até o CSV
-base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-csv_path = os.path.join(base_dir, "data", "Dados.csv")
+from ingest.cbo import ARQUIVO_CBO, IndiceCBO
 
-# Carrega o CSV
-df = pd.read_csv(csv_path)
+from . import dados_folha
+from .cache_colunar import mes_map
+from .rag import chroma_dir, consultar   # RAG construído sob demanda, com cache
+from .registro_tools import ferramenta
 
-# Normaliza meses para números
-mes_map = {
-    "Janeiro": 1, "Fevereiro": 2, "Março": 3, "Abril": 4,
-    "Maio": 5, "Junho": 6, "Julho": 7, "Agosto": 8,
-    "Setembro": 9, "Outubro": 10, "Novembro": 11, "Dezembro": 12
-}
-df["Mês"] = df["Mês"].map(mes_map)
-
-# Configuração do RAG
-chroma_dir = os.path.join(base_dir, "chrome_langchain_db")
-retriever = Chroma(
-    persist_directory=chroma_dir,
-    embedding_function=OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-).as_retriever()
-rag_chain = RetrievalQA.from_chain_type(
-    llm=ChatOpenAI(openai_api_key=os.getenv("OPENAI_API_KEY"), temperature=0),
-    retriever=retriever,
-    return_source_documents=False
-)
+# Carrega variáveis de ambiente
+load_dotenv()
 
 # ---------- SCHEMAS e DECORATOR PARA INSIGHTS ----------
 from pydantic import BaseModel
-from typing import List, Literal, Any, Dict
+from typing import List, Literal, Any, Dict, Optional
 
 class InsightSchema(BaseModel):
     tipo: Literal["linha", "barra", "pizza"]
@@ -50,249 +30,425 @@ class BatchInsights(BaseModel):
     insights: List[InsightSchema]
 
 
+def _normalizar(raw):
+    """Valida um retorno de insight(s) contra o BatchInsights; erros passam direto."""
+    if isinstance(raw, dict) and raw.get("erro"):
+        return raw
+    if isinstance(raw, dict) and "insights" not in raw:
+        raw = {"insights": [raw]}
+    batch = BatchInsights(**raw)
+    return batch.dict()
+
+
 def normalize_insights(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        raw = func(*args, **kwargs)
-        if isinstance(raw, dict) and raw.get("erro"):
-            return raw
-        if isinstance(raw, dict) and "insights" not in raw:
-            raw = {"insights": [raw]}
-        batch = BatchInsights(**raw)
-        return batch.dict()
+        return _normalizar(func(*args, **kwargs))
     return wrapper
 
-# ---------- FUNÇÕES DE CONSULTA E INSIGHTS ----------
-
-def consultar_documento_txt_ou_pdf(pergunta: str) -> dict:
-    resposta = rag_chain.run(pergunta)
-    return {"resposta": resposta}
+# ---------- MOTOR DE SÉRIES (fatia única + estatísticas vetorizadas) ----------
 
-@normalize_insights
-def get_informacoesCabecalho() -> dict:
-    cols = df.columns.tolist()
-    return {
-        "tipo": "pizza",
-        "titulo": "Colunas Disponíveis",
-        "eixo_x": [],
-        "eixo_y": "",
-        "dados": [{"label": c, "value": 0} for c in cols]
-    }
+ARGS_PERIODO = ("mes_inicial", "ano_inicial", "mes_final", "ano_final")
 
-@normalize_insights
-def get_Media(coluna: str) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    valores = df[coluna].dropna().round(2)
-    meses = [str(i+1) for i in range(len(valores))]
-    return {
-        "tipo": "linha",
-        "titulo": f"Média de {coluna}",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": [float(v) for v in valores]
-    }
+# Blocos de parâmetros compartilhados pelos schemas das tools
+PARAM_COLUNA = {"type": "string", "description": "Nome da coluna."}
+PARAMS_PERIODO = {
+    "mes_inicial": {"type": "string", "description": "Mês inicial (ex: 'Janeiro')"},
+    "ano_inicial": {"type": "integer", "description": "Ano inicial (ex: 2022)"},
+    "mes_final": {"type": "string", "description": "Mês final (ex: 'Dezembro')"},
+    "ano_final": {"type": "integer", "description": "Ano final (ex: 2023)"},
+}
+AGREGACOES = ("media", "maior", "menor", "total", "evolucao", "crescimento")
+
+# Nomes antigos das tools de série -> (agregação, variante da janela temporal).
+# Hoje são aliases de consultar_serie, traduzidos em dispatcher.call_function.
+FUNCOES_SERIE = {
+    "get_Media": ("media", "tudo"),
+    "get_Media_Periodo": ("media", "periodo"),
+    "get_Media_Ultimo": ("media", "ultimos"),
+    "get_Maior": ("maior", "tudo"),
+    "get_Maior_Periodo": ("maior", "periodo"),
+    "get_Maior_Ultimo": ("maior", "ultimos"),
+    "get_Menor": ("menor", "tudo"),
+    "get_Menor_Periodo": ("menor", "periodo"),
+    "get_Menor_Ultimo": ("menor", "ultimos"),
+    "get_Total": ("total", "tudo"),
+    "get_Total_Periodo": ("total", "periodo"),
+    "get_Total_Ultimo": ("total", "ultimos"),
+    "get_Evolucao_Periodo": ("evolucao", "periodo"),
+    "get_Crescimento_Percentual": ("crescimento", "tudo"),
+    "get_Crescimento_Percentual_Periodo": ("crescimento", "periodo"),
+}
 
-@normalize_insights
-def get_Media_Periodo(coluna: str, mes_inicial: str, ano_inicial: int, mes_final: str, ano_final: int) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    mi, mf = mes_map.get(mes_inicial.capitalize()), mes_map.get(mes_final.capitalize())
-    if not mi or not mf:
-        return {"erro": "Mês inválido."}
-    dfp = df.sort_values(["Ano","Mês"])
-    mask = ((dfp["Ano"]>ano_inicial) | ((dfp["Ano"]==ano_inicial)&(dfp["Mês"]>=mi))) & \
-           ((dfp["Ano"]<ano_final)  | ((dfp["Ano"]==ano_final)  &(dfp["Mês"]<=mf)))
-    sel = dfp[mask]
-    if sel.empty:
-        return {"erro": "Sem dados no período."}
-    meses = [f"{m}/{a}" for m,a in zip(sel["Mês"], sel["Ano"])]
-    vals = [round(v,2) for v in sel[coluna]]
-    media = round(sum(vals)/len(vals),2)
-    return {
-        "tipo": "linha",
-        "titulo": f"Média de {coluna} ({mes_inicial}/{ano_inicial}-{mes_final}/{ano_final})",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": vals
-    }
+TITULOS = {
+    ("media", "tudo"): "Média de {coluna}: {media}",
+    ("media", "periodo"): "Média de {coluna} ({mes_inicial}/{ano_inicial}-{mes_final}/{ano_final}): {media}",
+    ("media", "ultimos"): "Média últimos {meses} meses de {coluna}: {media}",
+    ("maior", "tudo"): "Maior {coluna}: {valor} em {mes_ref}/{ano_ref}",
+    ("maior", "periodo"): "Maior {coluna} no período: {valor} em {mes_ref}/{ano_ref}",
+    ("maior", "ultimos"): "Maior {coluna} últimos {meses} meses: {valor} em {mes_ref}/{ano_ref}",
+    ("menor", "tudo"): "Menor {coluna}: {valor} em {mes_ref}/{ano_ref}",
+    ("menor", "periodo"): "Menor {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {valor} em {mes_ref}/{ano_ref}",
+    ("menor", "ultimos"): "Menor {coluna} — últimos {meses} meses: {valor} em {mes_ref}/{ano_ref}",
+    ("total", "tudo"): "Total {coluna}: {total}",
+    ("total", "periodo"): "Total de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {total}",
+    ("total", "ultimos"): "Total de {coluna} – últimos {meses} meses: {total}",
+    ("evolucao", "tudo"): "Evolução de {coluna}",
+    ("evolucao", "periodo"): "Evolução de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}",
+    ("evolucao", "ultimos"): "Evolução de {coluna} – últimos {meses} meses",
+    ("crescimento", "tudo"): "Crescimento de {coluna}: {pct}%",
+    ("crescimento", "periodo"): "Crescimento de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {pct}%",
+    ("crescimento", "ultimos"): "Crescimento de {coluna} – últimos {meses} meses: {pct}%",
+}
 
-@normalize_insights
-def get_Media_Ultimo(coluna: str, meses: int) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    sel = df.sort_values(["Ano","Mês"]).tail(meses)
-    if sel.empty:
-        return {"erro": "Sem dados suficientes."}
-    meses_l = [f"{m}/{a}" for m,a in zip(sel["Mês"], sel["Ano"])]
-    vals = [round(v,2) for v in sel[coluna]]
-    return {
-        "tipo": "linha",
-        "titulo": f"Média últimos {meses} meses de {coluna}",
-        "eixo_x": meses_l,
-        "eixo_y": coluna,
-        "dados": vals
-    }
+ERROS_VAZIO = {
+    "tudo": "Não há dados disponíveis para o colaborador.",
+    "periodo": "Nenhum dado encontrado dentro do período especificado.",
+    "ultimos": "Não há dados suficientes para os últimos meses especificados.",
+}
 
-@normalize_insights
-def get_Maior(coluna: str) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    sel = df.sort_values(["Ano","Mês"])
-    idx = sel[coluna].idxmax(); lin = sel.loc[idx]
-    meses_l = [f"{m}/{a}" for m,a in zip(sel["Mês"], sel["Ano"])]
-    vals = [round(v,2) for v in sel[coluna]]
-    titulo = f"Maior {coluna}: {round(lin[coluna],2)} em {int(lin['Mês'])}/{int(lin['Ano'])}"
-    return {
-        "tipo": "linha",
-        "titulo": titulo,
-        "eixo_x": meses_l,
-        "eixo_y": coluna,
-        "dados": vals
-    }
 
-@normalize_insights
-def get_Maior_Periodo(coluna: str, mes_inicial: str, ano_inicial: int, mes_final: str, ano_final: int) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    mi, mf = mes_map.get(mes_inicial.capitalize()), mes_map.get(mes_final.capitalize())
-    if not mi or not mf:
-        return {"erro": "Mês inválido."}
-    dfp = df.sort_values(["Ano","Mês"])
-    mask = ((dfp["Ano"]>ano_inicial) | ((dfp["Ano"]==ano_inicial)&(dfp["Mês"]>=mi))) & \
-           ((dfp["Ano"]<ano_final)  | ((dfp["Ano"]==ano_final)  &(dfp["Mês"]<=mf)))
-    sel = dfp[mask]
-    if sel.empty:
-        return {"erro": "Sem dados no período."}
-    idx = sel[coluna].idxmax(); lin = sel.loc[idx]
-    meses_l = [f"{m}/{a}" for m,a in zip(sel["Mês"], sel["Ano"])]
-    vals = [round(v,2) for v in sel[coluna]]
-    titulo = f"Maior {coluna} no período: {round(lin[coluna],2)} em {int(lin['Mês'])}/{int(lin['Ano'])}"
-    return {
-        "tipo": "linha",
-        "titulo": titulo,
-        "eixo_x": meses_l,
-        "eixo_y": coluna,
-        "dados": vals
-    }
+def _janela(periodo: Optional[dict], ultimos_n: Optional[int]) -> tuple:
+    """
+    Converte os argumentos temporais em (janela, campos do título). A janela é
+    hashable: ("tudo",), ("periodo", mi, ai, mf, af) ou ("ultimos", n).
+    Levanta ValueError para combinações ou meses inválidos.
+    """
+    if periodo and ultimos_n is not None:
+        raise ValueError("Informe 'periodo' ou 'ultimos_n', não ambos.")
+    if ultimos_n is not None:
+        return ("ultimos", int(ultimos_n)), {"meses": int(ultimos_n)}
+    if periodo:
+        faltando = [k for k in ARGS_PERIODO if periodo.get(k) is None]
+        if faltando:
+            raise ValueError(f"Período incompleto: informe {', '.join(faltando)}.")
+        mi = mes_map.get(str(periodo["mes_inicial"]).capitalize())
+        mf = mes_map.get(str(periodo["mes_final"]).capitalize())
+        if mi is None or mf is None:
+            raise ValueError("Mês inicial ou final inválido.")
+        janela = ("periodo", mi, int(periodo["ano_inicial"]), mf, int(periodo["ano_final"]))
+        return janela, {k: periodo[k] for k in ARGS_PERIODO}
+    return ("tudo",), {}
+
+
+def _fatia(folha, janela: tuple) -> pd.DataFrame:
+    """Seleciona as linhas da janela usando o índice por período do FolhaStore."""
+    if janela[0] == "ultimos":
+        return folha.ultimos(janela[1])
+    if janela[0] == "periodo":
+        return folha.periodo(*janela[1:])
+    return folha.tudo()
+
+
+def _valida_coluna(folha, coluna: str) -> Optional[str]:
+    if coluna not in folha.columns:
+        return f"Coluna '{coluna}' não encontrada na base de dados."
+    if not pd.api.types.is_numeric_dtype(folha.df[coluna]):
+        return f"Coluna '{coluna}' não é numérica."
+    return None
+
+
+def estatisticas(sel: pd.DataFrame, colunas: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Calcula maior/menor (com posição), média, soma e crescimento percentual
+    de várias colunas de uma mesma fatia em uma única passada vetorizada.
+    """
+    if sel.empty or not colunas:
+        return {}
+    matriz = sel[colunas].to_numpy(dtype="float64")
+    pos_maior = np.nanargmax(matriz, axis=0)
+    pos_menor = np.nanargmin(matriz, axis=0)
+    soma = np.nansum(matriz, axis=0)
+    media = np.nanmean(matriz, axis=0)
+    inicial, final = matriz[0], matriz[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crescimento = (final - inicial) / inicial * 100
+
+    stats = {}
+    for j, c in enumerate(colunas):
+        inteiro = pd.api.types.is_integer_dtype(sel[c])
+        stats[c] = {
+            "pos_maior": int(pos_maior[j]),
+            "pos_menor": int(pos_menor[j]),
+            "soma": int(soma[j]) if inteiro else round(float(soma[j]), 2),
+            "media": round(float(media[j]), 2),
+            "inicial": float(inicial[j]),
+            "crescimento": round(float(crescimento[j]), 2) if inicial[j] != 0 else None,
+        }
+    return stats
+
+
+def _renderizar(agregacao: str, variante: str, coluna: str, sel: pd.DataFrame, stats: dict, campos: dict) -> dict:
+    """Monta o insight de uma coluna × agregação a partir da fatia e das estatísticas já calculadas."""
+    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
+    nativos = sel[coluna].tolist()
+    valores = [round(v, 2) for v in nativos]
+    campos = dict(campos, coluna=coluna)
+    tipo = "linha"
+
+    if agregacao == "media":
+        campos["media"] = stats["media"]
+        if variante == "tudo":
+            valores = [float(v) for v in sel[coluna].dropna().round(2)]
+            meses = [str(i + 1) for i in range(len(valores))]
+    elif agregacao in ("maior", "menor"):
+        pos = stats["pos_maior" if agregacao == "maior" else "pos_menor"]
+        campos.update(
+            valor=round(nativos[pos], 2),
+            mes_ref=int(sel["Mês"].iloc[pos]),
+            ano_ref=int(sel["Ano"].iloc[pos]),
+        )
+    elif agregacao == "total":
+        tipo = "barra"
+        campos["total"] = stats["soma"]
+    elif agregacao == "crescimento":
+        tipo = "barra"
+        if len(sel) < 2:
+            return {"erro": "Não há dados suficientes para calcular crescimento percentual."}
+        if stats["crescimento"] is None:
+            return {"erro": "Valor inicial é zero, não é possível calcular variação percentual."}
+        campos["pct"] = stats["crescimento"]
+        if variante == "tudo":
+            meses = [meses[0], meses[-1]]
+            valores = [valores[0], valores[-1]]
 
-@normalize_insights
-def get_Maior_Ultimo(coluna: str, meses: int) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    sel = df.sort_values(["Ano","Mês"]).tail(meses)
-    if sel.empty:
-        return {"erro": "Sem dados suficientes."}
-    idx = sel[coluna].idxmax(); lin = sel.loc[idx]
-    meses_l = [f"{m}/{a}" for m,a in zip(sel["Mês"], sel["Ano"])]
-    vals = [round(v,2) for v in sel[coluna]]
-    titulo = f"Maior {coluna} últimos {meses} meses: {round(lin[coluna],2)} em {int(lin['Mês'])}/{int(lin['Ano'])}"
     return {
-        "tipo": "linha",
-        "titulo": titulo,
-        "eixo_x": meses_l,
+        "tipo": tipo,
+        "titulo": TITULOS[(agregacao, variante)].format(**campos),
+        "eixo_x": meses,
         "eixo_y": coluna,
-        "dados": vals
+        "dados": valores
     }
 
-@normalize_insights
-def get_Total(coluna: str) -> dict:
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada."}
-    meses_l = [f"{m}/{a}" for m,a in zip(df["Mês"], df["Ano"])]
-    vals = [round(v,2) for v in df[coluna]]
-    total = round(sum(vals),2)
-    return {
-        "tipo": "barra",
-        "titulo": f"Total {coluna}: {total}",
-        "eixo_x": meses_l,
-        "eixo_y": coluna,
-        "dados": vals
-    }
 
-@normalize_insights
-def get_Total_Periodo(
-    coluna: str,
-    mes_inicial: str,
-    ano_inicial: int,
-    mes_final: str,
-    ano_final: int
+def _preparar_serie(
+    colunas: List[str],
+    agregacoes: List[str],
+    periodo: Optional[dict] = None,
+    ultimos_n: Optional[int] = None,
+    colaborador: Optional[str] = None
+) -> tuple:
+    """Valida uma chamada de consultar_serie: (folha, janela, colunas, agregações, campos do título)."""
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        raise ValueError(dados_folha.erro_colaborador(colaborador))
+    colunas = [colunas] if isinstance(colunas, str) else list(dict.fromkeys(colunas or []))
+    agregacoes = [agregacoes] if isinstance(agregacoes, str) else list(dict.fromkeys(agregacoes or []))
+    if not colunas or not agregacoes:
+        raise ValueError("Informe ao menos uma coluna e uma agregação.")
+    for agregacao in agregacoes:
+        if agregacao not in AGREGACOES:
+            raise ValueError(f"Agregação '{agregacao}' inválida. Use: {', '.join(AGREGACOES)}.")
+    for coluna in colunas:
+        erro = _valida_coluna(folha, coluna)
+        if erro:
+            raise ValueError(erro)
+    janela, campos = _janela(periodo, ultimos_n)
+    return folha, janela, colunas, agregacoes, campos
+
+
+def _renderizar_serie(colunas, agregacoes, variante: str, sel: pd.DataFrame, stats: dict, campos: dict) -> dict:
+    """
+    Um insight por coluna × agregação. Agregações que não puderem ser
+    calculadas (ex.: crescimento com valor inicial zero) vão para "avisos";
+    se nenhuma puder, o resultado é um erro.
+    """
+    if sel.empty:
+        return {"erro": ERROS_VAZIO[variante]}
+    insights, avisos = [], []
+    for coluna in colunas:
+        for agregacao in agregacoes:
+            insight = _renderizar(agregacao, variante, coluna, sel, stats[coluna], campos)
+            if "erro" in insight:
+                avisos.append(insight["erro"])
+            else:
+                insights.append(insight)
+    if not insights:
+        return {"erro": " ".join(dict.fromkeys(avisos))}
+    resultado = _normalizar({"insights": insights})
+    if avisos:
+        resultado["avisos"] = avisos
+    return resultado
+
+
+@ferramenta(
+    "Calcula, em uma única chamada, uma ou mais agregações de uma ou mais colunas numéricas da folha: "
+    "em todo o histórico, em um período mes/ano - mes/ano ou nos últimos N meses. "
+    "Retorna um insight gráfico por coluna e agregação; prefira pedir tudo de uma vez.",
+    colunas={
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Nomes das colunas (ex.: ['Salário Base', 'Comissão']).",
+    },
+    agregacoes={
+        "type": "array",
+        "items": {"type": "string", "enum": list(AGREGACOES)},
+        "description": "media, maior/menor valor (com mês), total acumulado, evolucao mês a mês "
+                       "e crescimento percentual do primeiro ao último mês.",
+    },
+    periodo={
+        "type": ["object", "null"],
+        "description": "Período mes/ano - mes/ano. Use null para todo o histórico ou ao usar ultimos_n.",
+        "properties": PARAMS_PERIODO,
+        "required": list(ARGS_PERIODO),
+        "additionalProperties": False,
+    },
+    ultimos_n={
+        "type": ["integer", "null"],
+        "description": "Quantidade de meses mais recentes. Use null para todo o histórico ou ao usar periodo.",
+    },
+)
+def consultar_serie(
+    colunas: List[str],
+    agregacoes: List[str],
+    periodo: Optional[dict] = None,
+    ultimos_n: Optional[int] = None,
+    colaborador: Optional[str] = None
 ) -> dict:
     """
-    Retorna os valores mensais e o total acumulado da coluna especificada
-    entre mes_inicial/ano_inicial e mes_final/ano_final, formatados como um insight.
+    Calcula várias agregações (media, maior, menor, total, evolucao,
+    crescimento) de várias colunas sobre a mesma janela temporal — todo o
+    histórico, um período mes/ano - mes/ano ou os últimos N meses — com uma
+    única fatia e uma única passada vetorizada.
     """
-    # valida coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
+    try:
+        folha, janela, colunas, agregacoes, campos = _preparar_serie(
+            colunas, agregacoes, periodo, ultimos_n, colaborador
+        )
+    except (TypeError, ValueError) as e:
+        return {"erro": str(e)}
+    sel = _fatia(folha, janela)
+    return _renderizar_serie(colunas, agregacoes, janela[0], sel, estatisticas(sel, colunas), campos)
 
-    # converte meses
-    mi = mes_map.get(mes_inicial.capitalize())
-    mf = mes_map.get(mes_final.capitalize())
-    if mi is None or mf is None:
-        return {"erro": "Mês inicial ou final inválido."}
 
-    # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) |
-         ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) |
-         ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
-    if sel.empty:
-        return {"erro": "Nenhum dado encontrado dentro do período especificado."}
+def executar_lote_series(chamadas: List[tuple]) -> List[Optional[dict]]:
+    """
+    Executa várias chamadas de consultar_serie de uma vez. As chamadas são
+    agrupadas por colaborador e janela temporal; cada grupo seleciona sua fatia
+    uma única vez e calcula as estatísticas de todas as colunas pedidas numa só
+    passada. Retorna um resultado por chamada (None para outras tools).
+    """
+    resultados: List[Optional[dict]] = [None] * len(chamadas)
+    grupos: Dict[tuple, tuple] = {}
+
+    for i, (nome, argumentos) in enumerate(chamadas):
+        if nome != "consultar_serie":
+            continue
+        try:
+            folha, janela, colunas, agregacoes, campos = _preparar_serie(**argumentos)
+        except (TypeError, ValueError) as e:
+            resultados[i] = {"erro": str(e)}
+            continue
+        grupos.setdefault((id(folha), janela), (folha, janela, []))[2].append((i, colunas, agregacoes, campos))
+
+    for folha, janela, itens in grupos.values():
+        sel = _fatia(folha, janela)
+        stats = estatisticas(sel, list(dict.fromkeys(c for _, colunas, _, _ in itens for c in colunas)))
+        for i, colunas, agregacoes, campos in itens:
+            try:
+                resultados[i] = _renderizar_serie(colunas, agregacoes, janela[0], sel, stats, campos)
+            except Exception as e:
+                resultados[i] = {"erro": str(e)}
+    return resultados
 
-    # monta listas para o gráfico
-    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-    total_acumulado = round(sum(valores), 2)
+# ---------- FUNÇÕES DE CONSULTA E INSIGHTS ----------
+
+@ferramenta(
+    "Consulta documentos TXT ou PDF indexados para responder perguntas não-numéricas sobre a folha.",
+    colaborador=False,
+    cache=False,
+    pergunta={
+        "type": "string",
+        "description": "Pergunta sobre os documentos, como 'O que é FGTS?' ou 'Como funciona o IRRF?'",
+    },
+)
+def consultar_documento_txt_ou_pdf(pergunta: str) -> dict:
+    resposta = consultar(pergunta)
+    return {"resposta": resposta}
 
+# Índice código CBO -> título gerado na ingestão (ver ingest/cbo.py); relido só quando o arquivo muda
+_indice_cbo: tuple = (None, None)
+
+
+def obter_indice_cbo() -> Optional[IndiceCBO]:
+    global _indice_cbo
+    try:
+        assinatura = os.stat(os.path.join(chroma_dir, ARQUIVO_CBO)).st_mtime_ns
+    except OSError:
+        return None
+    if _indice_cbo[0] != assinatura:
+        _indice_cbo = (assinatura, IndiceCBO.carregar(chroma_dir))
+    return _indice_cbo[1]
+
+
+@ferramenta(
+    "Consulta um código CBO na tabela da CBO 2002 (consulta exata, sem busca em documentos): a ocupação, "
+    "quando consta da tabela, ou o grupo mais específico conhecido. Sem código, usa o CBO do colaborador na folha.",
+    cache=False,
+    cbo={
+        "type": ["string", "null"],
+        "description": "Código CBO, como '2410-05'. Use null para o CBO do colaborador.",
+    },
+)
+def consultar_cbo(cbo: Optional[str] = None, colaborador: Optional[str] = None) -> dict:
+    resultado = {}
+    if cbo is None:
+        folha = dados_folha.store.colaborador(colaborador)
+        if folha is None:
+            return {"erro": dados_folha.erro_colaborador(colaborador)}
+        if "CBO" not in folha.columns or len(folha) == 0:
+            return {"erro": "A folha não possui a coluna 'CBO'."}
+        ultima = folha.tudo().iloc[-1]
+        cbo = str(ultima["CBO"])
+        if "Cargo" in folha.columns:
+            resultado["cargo"] = str(ultima["Cargo"])
+    indice = obter_indice_cbo()
+    if indice is None:
+        return {"erro": "Índice CBO indisponível. Execute a ingestão dos documentos (ingest/pdf_ingestor.py)."}
+    hierarquia = indice.resolver(cbo)
+    if not hierarquia:
+        return {"erro": f"Código CBO '{cbo}' não encontrado na tabela."}
+    if hierarquia[0]["nivel"] == "ocupação":
+        return {"cbo": cbo, **resultado, "ocupacao": hierarquia[0], "hierarquia": hierarquia}
+    # a tabela indexada não chega ao nível da ocupação: só o grupo mais específico é conhecido
     return {
-        "tipo": "barra",
-        "titulo": f"Total de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {total_acumulado}",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": valores
+        "cbo": cbo,
+        **resultado,
+        "grupo": hierarquia[0],
+        "hierarquia": hierarquia,
+        "observacao": (
+            f"A ocupação do código {cbo} não consta da tabela indexada; "
+            f"'{hierarquia[0]['titulo']}' é o {hierarquia[0]['nivel']} ao qual ele pertence, não a ocupação."
+        ),
     }
 
-@normalize_insights
-def get_Total_Ultimo(coluna: str, meses: int) -> dict:
-    """
-    Retorna a soma dos valores da coluna especificada nos últimos N meses,
-    formatado como um insight de barra com dados mensais e total acumulado.
-    """
-    # Validação da coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
 
-    # Seleciona os últimos N meses
-    sel = df.sort_values(["Ano", "Mês"]).tail(meses)
-    if sel.empty:
-        return {"erro": "Não há dados suficientes para os últimos meses especificados."}
-
-    # Prepara eixos e valores
-    meses_x = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-    total = round(sum(valores), 2)
-
-    # Retorna o insight padronizado
+@ferramenta("Retorna quais colunas estão presentes na folha de pagamento.")
+@normalize_insights
+def get_informacoesCabecalho(colaborador: Optional[str] = None) -> dict:
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
+    cols = folha.columns.tolist()
     return {
-        "tipo": "barra",
-        "titulo": f"Total de {coluna} – últimos {meses} meses: {total}",
-        "eixo_x": meses_x,
-        "eixo_y": coluna,
-        "dados": valores
+        "tipo": "pizza",
+        "titulo": "Colunas Disponíveis",
+        "eixo_x": [],
+        "eixo_y": "",
+        "dados": [{"label": c, "value": 0} for c in cols]
     }
 
-def get_Evolucao(coluna: str) -> dict:
+@ferramenta("Retorna a evolução mês a mês dos valores da coluna.", coluna=PARAM_COLUNA)
+def get_Evolucao(coluna: str, colaborador: Optional[str] = None) -> dict:
     """Retorna a evolução mês a mês da coluna especificada durante todo o período, formatada para visualização."""
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
 
-    if coluna not in df.columns:
+    if coluna not in folha.columns:
         return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
 
-    dados_ordenados = df.sort_values(by=["Ano", "Mês"])
+    dados_ordenados = folha.tudo()
 
     dados = [
         {f"{str(mes)}/{str(ano)}": round(valor, 2)}
@@ -307,62 +463,23 @@ def get_Evolucao(coluna: str) -> dict:
         "dados": dados
     }
 
+@ferramenta(
+    "Retorna o valor da coluna em um mês e ano específicos.",
+    coluna=PARAM_COLUNA,
+    mes={"type": "string", "description": "Mês (ex: 'Março')"},
+    ano={"type": "integer", "description": "Ano (ex: 2023)"},
+)
 @normalize_insights
-def get_Evolucao_Periodo(
-    coluna: str,
-    mes_inicial: str,
-    ano_inicial: int,
-    mes_final: str,
-    ano_final: int
-) -> dict:
-    """
-    Retorna a evolução mês a mês da coluna especificada dentro de um período,
-    formatada como um insight de linha.
-    """
-    # valida coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # converte meses
-    mi = mes_map.get(mes_inicial.capitalize())
-    mf = mes_map.get(mes_final.capitalize())
-    if mi is None or mf is None:
-        return {"erro": "Mês inicial ou final inválido."}
-
-    # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) |
-         ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) |
-         ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
-    if sel.empty:
-        return {"erro": "Nenhum dado encontrado dentro do período especificado."}
-
-    # prepara eixos e valores
-    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-
-    # retorna insight padronizado
-    return {
-        "tipo": "linha",
-        "titulo": f"Evolução de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": valores
-    }
-
-@normalize_insights
-def get_Mes_Ano(coluna: str, mes: str, ano: int) -> dict:
+def get_Mes_Ano(coluna: str, mes: str, ano: int, colaborador: Optional[str] = None) -> dict:
     """
     Retorna o valor da coluna em um mês e ano específicos,
     formatado como um insight de pizza (único valor destacado).
     """
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
     # Validação da coluna
-    if coluna not in df.columns:
+    if coluna not in folha.columns:
         return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
 
     # Converte o nome do mês
@@ -371,7 +488,7 @@ def get_Mes_Ano(coluna: str, mes: str, ano: int) -> dict:
         return {"erro": f"Mês '{mes}' inválido."}
 
     # Filtra o mês/ano desejado
-    sel = df[(df["Mês"] == mi) & (df["Ano"] == ano)]
+    sel = folha.mes_ano(mi, ano)
     if sel.empty:
         return {"erro": f"Nenhum dado encontrado para {mes}/{ano}."}
 
@@ -387,250 +504,37 @@ def get_Mes_Ano(coluna: str, mes: str, ano: int) -> dict:
         "dados": [{"label": coluna, "value": valor}]
     }
 
-@normalize_insights
-def get_Crescimento_Percentual(coluna: str) -> dict:
-    """
-    Retorna o crescimento percentual da coluna do primeiro até o último mês,
-    formatado como um insight de barra com o valor inicial e final.
-    """
-    # valida coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # ordena cronologicamente
-    sel = df.sort_values(["Ano", "Mês"])
-    if len(sel) < 2:
-        return {"erro": "Não há dados suficientes para calcular crescimento percentual."}
-
-    # extrai valores
-    valor_inicial = sel[coluna].iloc[0]
-    valor_final   = sel[coluna].iloc[-1]
-    if valor_inicial == 0:
-        return {"erro": "Valor inicial é zero, não é possível calcular variação percentual."}
-
-    # calcula crescimento
-    crescimento = round(((valor_final - valor_inicial) / valor_inicial) * 100, 2)
-
-    # monta insight
-    mes_ini = f"{int(sel['Mês'].iloc[0])}/{int(sel['Ano'].iloc[0])}"
-    mes_fin = f"{int(sel['Mês'].iloc[-1])}/{int(sel['Ano'].iloc[-1])}"
-    return {
-        "tipo": "barra",
-        "titulo": f"Crescimento de {coluna}: {crescimento}%",
-        "eixo_x": [mes_ini, mes_fin],
-        "eixo_y": coluna,
-        "dados": [round(valor_inicial, 2), round(valor_final, 2)]
-    }
-
-@normalize_insights
-def get_Crescimento_Percentual_Periodo(
-    coluna: str,
-    mes_inicial: str,
-    ano_inicial: int,
-    mes_final: str,
-    ano_final: int
-) -> dict:
-    """
-    Retorna o crescimento percentual da coluna dentro de um período,
-    formatado como um insight de barra com todos os valores mensais e o percentual.
-    """
-    # validação da coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # converte meses
-    mi = mes_map.get(mes_inicial.capitalize())
-    mf = mes_map.get(mes_final.capitalize())
-    if mi is None or mf is None:
-        return {"erro": "Mês inicial ou final inválido."}
-
-    # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) |
-         ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) |
-         ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
-    if sel.empty or len(sel) < 2:
-        return {"erro": "Período inválido ou com dados insuficientes para calcular o crescimento."}
-
-    # calcula crescimento
-    inicial = sel[coluna].iloc[0]
-    final   = sel[coluna].iloc[-1]
-    if inicial == 0:
-        return {"erro": "Valor inicial é zero; não é possível calcular variação percentual."}
-    pct     = round(((final - inicial) / inicial) * 100, 2)
-
-    # prepara eixos e valores
-    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    vals  = [round(v, 2) for v in sel[coluna]]
-
-    # monta insight
-    return {
-        "tipo": "barra",
-        "titulo": f"Crescimento de {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {pct}%",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": vals
-    }
-
-@normalize_insights
-def get_Menor(coluna: str) -> dict:
-    """
-    Retorna o menor valor da coluna especificada, juntamente com todos os dados individuais,
-    formatado como um insight de linha destacando o valor mínimo.
-    """
-    # valida coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # encontra o índice do menor valor
-    sel = df.sort_values(["Ano", "Mês"])
-    idx = sel[coluna].idxmin()
-    linha = sel.loc[idx]
-
-    # lista de meses e valores
-    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-
-    # título com o menor valor e sua data
-    valor_min = round(linha[coluna], 2)
-    mes_min   = int(linha["Mês"])
-    ano_min   = int(linha["Ano"])
-    titulo = f"Menor {coluna}: {valor_min} em {mes_min}/{ano_min}"
-
-    return {
-        "tipo": "linha",
-        "titulo": titulo,
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": valores
-    }
-
-@normalize_insights
-def get_Menor_Periodo(
-    coluna: str,
-    mes_inicial: str,
-    ano_inicial: int,
-    mes_final: str,
-    ano_final: int
-) -> dict:
-    """
-    Retorna o menor valor da coluna especificada dentro de um período,
-    com dados mensais, formatado como um insight de linha.
-    """
-    # validação da coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # converte meses
-    mi = mes_map.get(mes_inicial.capitalize())
-    mf = mes_map.get(mes_final.capitalize())
-    if mi is None or mf is None:
-        return {"erro": "Mês inicial ou final inválido."}
-
-    # filtra e ordena período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) |
-         ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) |
-         ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
-    if sel.empty:
-        return {"erro": "Nenhum dado encontrado dentro do período especificado."}
-
-    # lista de meses e valores
-    meses = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-
-    # encontra o menor valor e sua posição
-    idx = sel[coluna].idxmin()
-    linha = sel.loc[idx]
-    valor_min = round(linha[coluna], 2)
-    mes_min   = int(linha["Mês"])
-    ano_min   = int(linha["Ano"])
-
-    # monta insight
-    return {
-        "tipo": "linha",
-        "titulo": f"Menor {coluna} de {mes_inicial}/{ano_inicial} a {mes_final}/{ano_final}: {valor_min} em {mes_min}/{ano_min}",
-        "eixo_x": meses,
-        "eixo_y": coluna,
-        "dados": valores
-    }
-
-@normalize_insights
-def get_Menor_Ultimo(coluna: str, meses: int) -> dict:
-    """
-    Retorna o menor valor da coluna especificada nos últimos N meses,
-    formatado como um insight de linha com os dados mensais e destaque do mínimo.
-    """
-    # validação da coluna
-    if coluna not in df.columns:
-        return {"erro": f"Coluna '{coluna}' não encontrada na base de dados."}
-
-    # seleciona e ordena os últimos N meses
-    sel = df.sort_values(["Ano", "Mês"]).tail(meses)
-    if sel.empty:
-        return {"erro": "Não há dados suficientes para os últimos meses especificados."}
-
-    # prepara eixos e valores
-    meses_x = [f"{m}/{a}" for m, a in zip(sel["Mês"], sel["Ano"])]
-    valores = [round(v, 2) for v in sel[coluna]]
-
-    # encontra o menor valor e sua data
-    idx_min = sel[coluna].idxmin()
-    linha_min = sel.loc[idx_min]
-    valor_min = round(linha_min[coluna], 2)
-    mes_min   = int(linha_min["Mês"])
-    ano_min   = int(linha_min["Ano"])
-
-    # título destacando o mínimo
-    titulo = f"Menor {coluna} — últimos {meses} meses: {valor_min} em {mes_min}/{ano_min}"
-
-    return {
-        "tipo": "linha",
-        "titulo": titulo,
-        "eixo_x": meses_x,
-        "eixo_y": coluna,
-        "dados": valores
-    }
-
+@ferramenta(
+    "Retorna um resumo detalhado dos descontos por tipo e por mês, dentro de um período especificado.",
+    **PARAMS_PERIODO,
+)
 @normalize_insights
 def get_Resumo_Descontos_Periodo(
     mes_inicial: str,
     ano_inicial: int,
     mes_final: str,
-    ano_final: int
+    ano_final: int,
+    colaborador: Optional[str] = None
 ) -> dict:
     """
     Retorna um batch de insights com:
     1) pizza de Descontos por Tipo no período
     2) linha da evolução mensal do total de descontos
     """
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
     # valida colunas
     colunas = ["INSS (R$)", "IRRF (R$)", "Plano de Saúde"]
     for c in colunas:
-        if c not in df.columns:
+        if c not in folha.columns:
             return {"erro": f"A coluna de desconto '{c}' não foi encontrada na base de dados."}
     # converte meses
     mi, mf = mes_map.get(mes_inicial.capitalize()), mes_map.get(mes_final.capitalize())
     if mi is None or mf is None:
         return {"erro": "Mês inicial ou final inválido."}
     # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) | ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) | ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
+    sel = folha.periodo(mi, ano_inicial, mf, ano_final)
     if sel.empty:
         return {"erro": "Nenhum dado encontrado dentro do período especificado."}
     # cálculo por tipo
@@ -655,22 +559,30 @@ def get_Resumo_Descontos_Periodo(
     }
     return {"insights": [insight_tipo, insight_mensal]}
 
+@ferramenta(
+    "Retorna um resumo detalhado dos vencimentos por tipo e por mês, dentro de um período especificado.",
+    **PARAMS_PERIODO,
+)
 @normalize_insights
 def get_Resumo_Vencimentos_Periodo(
     mes_inicial: str,
     ano_inicial: int,
     mes_final: str,
-    ano_final: int
+    ano_final: int,
+    colaborador: Optional[str] = None
 ) -> dict:
     """
     Retorna um batch de insights com:
     1) pizza de Vencimentos por Tipo no período
     2) linha da evolução mensal do total de vencimentos
     """
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
     # valida colunas de vencimento
     cols = ["Salário Base", "Comissão", "Bonificações", "Horas Extras", "Valores Adicionais"]
     for c in cols:
-        if c not in df.columns:
+        if c not in folha.columns:
             return {"erro": f"A coluna de vencimento '{c}' não foi encontrada na base de dados."}
 
     # converte meses
@@ -679,13 +591,7 @@ def get_Resumo_Vencimentos_Periodo(
         return {"erro": "Mês inicial ou final inválido."}
 
     # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) | ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) | ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
+    sel = folha.periodo(mi, ano_inicial, mf, ano_final)
     if sel.empty:
         return {"erro": "Nenhum dado encontrado dentro do período especificado."}
 
@@ -712,12 +618,17 @@ def get_Resumo_Vencimentos_Periodo(
 
     return {"insights": [insight_tipo, insight_mensal]}
 
+@ferramenta(
+    "Retorna um resumo completo da folha de pagamento (vencimentos, descontos e líquido) no período especificado.",
+    **PARAMS_PERIODO,
+)
 @normalize_insights
 def get_Resumo_Folha_Periodo(
     mes_inicial: str,
     ano_inicial: int,
     mes_final: str,
-    ano_final: int
+    ano_final: int,
+    colaborador: Optional[str] = None
 ) -> dict:
     """
     Retorna um batch de insights com:
@@ -726,11 +637,14 @@ def get_Resumo_Folha_Periodo(
     3) pizza de Descontos por Tipo
     4) linha de Líquido Mês a Mês
     """
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
     # valida colunas
     col_venc = ["Salário Base", "Comissão", "Bonificações", "Horas Extras", "Valores Adicionais"]
     col_desc = ["INSS (R$)", "IRRF (R$)", "Plano de Saúde"]
     for c in col_venc + col_desc:
-        if c not in df.columns:
+        if c not in folha.columns:
             return {"erro": f"A coluna '{c}' não foi encontrada na base de dados."}
 
     # converte meses
@@ -740,15 +654,7 @@ def get_Resumo_Folha_Periodo(
         return {"erro": "Mês inicial ou final inválido."}
 
     # filtra período
-    dfp = df.sort_values(["Ano", "Mês"])
-    mask = (
-        ((dfp["Ano"] > ano_inicial) |
-         ((dfp["Ano"] == ano_inicial) & (dfp["Mês"] >= mi)))
-        &
-        ((dfp["Ano"] < ano_final) |
-         ((dfp["Ano"] == ano_final) & (dfp["Mês"] <= mf)))
-    )
-    sel = dfp[mask]
+    sel = folha.periodo(mi, ano_inicial, mf, ano_final)
     if sel.empty:
         return {"erro": "Nenhum dado encontrado no período especificado."}
 
@@ -806,29 +712,43 @@ def get_Resumo_Folha_Periodo(
     return {"insights": [insight1, insight2, insight3, insight4]}
 
 
+@ferramenta(
+    "Gera um único gráfico de pizza com a participação percentual de cada tipo de vencimento em um mês/ano.",
+    colunas={
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Lista de colunas de vencimento (ex.: ['Salário Base','Comissão',…])",
+    },
+    mes={"type": "string", "description": "Mês desejado (ex.: 'Maio')"},
+    ano={"type": "integer", "description": "Ano desejado (ex.: 2021)"},
+)
 @normalize_insights
 def get_Participacao_Vencimentos(
     colunas: List[str],
     mes: str,
-    ano: int
+    ano: int,
+    colaborador: Optional[str] = None
 ) -> dict:
     """
     Gera um insight de pizza com a participação percentual
     de cada coluna de vencimento em um mês/ano específico.
     """
+    folha = dados_folha.store.colaborador(colaborador)
+    if folha is None:
+        return {"erro": dados_folha.erro_colaborador(colaborador)}
     # converte mês
     mes_num = mes_map.get(mes.capitalize())
     if mes_num is None:
         return {"erro": f"Mês '{mes}' inválido."}
 
-    linha = df[(df["Mês"] == mes_num) & (df["Ano"] == ano)]
+    linha = folha.mes_ano(mes_num, ano)
     if linha.empty:
         return {"erro": f"Sem dados para {mes}/{ano}."}
 
     linha = linha.iloc[0]
     dados = []
     for col in colunas:
-        if col in df.columns:
+        if col in folha.columns:
             dados.append({"label": col, "value": round(linha[col], 2)})
         else:
             return {"erro": f"Coluna '{col}' não existe."}
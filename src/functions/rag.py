@@ -0,0 +1,368 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from ingest.embeddings import ARQUIVO_MANIFESTO
+from ingest.lexico import IndiceBM25, termos_lexicos
+
+load_dotenv()
+
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ------------------------------------------------------------------
+# RAG sobre os documentos (construído sob demanda)
+# O Chroma, os embeddings e a cadeia de resposta só são criados na primeira
+# consulta a documentos que não esteja em cache; processos que usam apenas
+# as tools numéricas nunca importam o langchain nem abrem a base vetorial.
+#
+# Cache em dois níveis, persistido em SQLite ao lado da base vetorial:
+#   1º nível: pergunta normalizada -> ids dos chunks recuperados
+#   2º nível: (pergunta normalizada, ids dos chunks) -> resposta
+# Reindexar a base muda a versão do índice e esvazia os dois níveis.
+#
+# Recuperação híbrida: o ranking vetorial (Chroma) e o lexical (BM25,
+# gerado na ingestão) são fundidos por reciprocal rank fusion. Perguntas
+# curtas sobre uma sigla ou um código CBO usam só o BM25, sem embedding.
+# ------------------------------------------------------------------
+chroma_dir = os.path.join(base_dir, "chrome_langchain_db")
+K_DOCUMENTOS = int(os.getenv("RAG_K", "4"))
+HIBRIDO = os.getenv("RAG_HIBRIDO", "1") != "0"
+CANDIDATOS = 3          # cada ranking contribui com K_DOCUMENTOS * CANDIDATOS candidatos à fusão
+RRF_K = 60
+
+SIGLAS = {"fgts", "irrf", "inss", "pis", "pasep", "cbo", "clt", "ctps", "dsr", "rais",
+          "caged", "esocial", "fap", "rat", "sat", "plr", "vt", "vr", "va"}
+PALAVRAS_VAZIAS = {"o", "a", "os", "as", "e", "de", "do", "da", "dos", "das", "que", "qual", "quais",
+                   "um", "uma", "em", "no", "na", "para", "por", "como", "sobre", "me", "significa"}
+MAX_TERMOS_LEXICAL = 3
+_CODIGO_CBO = re.compile(r"\d{4}-\d{2}")
+
+
+def normalizar_pergunta(pergunta: str) -> str:
+    """Minúsculas, sem acentos nem pontuação: variações triviais caem na mesma chave."""
+    sem_acento = unicodedata.normalize("NFKD", pergunta or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"\w+", sem_acento.lower()))
+
+
+_versao_memo: Dict[str, Tuple[tuple, str]] = {}
+
+
+def versao_indice(diretorio: str = chroma_dir) -> str:
+    """
+    Identidade do conteúdo indexado: hash da configuração e dos ids dos
+    chunks do manifesto. Só muda quando a indexação altera a base; o
+    manifesto só é relido quando seu tamanho ou mtime mudam.
+    """
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    try:
+        estado = os.stat(caminho)
+    except OSError:
+        return "sem-manifesto"
+    assinatura = (estado.st_size, estado.st_mtime_ns)
+    memo = _versao_memo.get(caminho)
+    if memo and memo[0] == assinatura:
+        return memo[1]
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            manifesto = json.load(f)
+        conteudo = json.dumps(
+            [manifesto.get("config"), sorted(i for info in manifesto["arquivos"].values() for i in info["chunks"])]
+        )
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        conteudo = f"{estado.st_size}:{estado.st_mtime_ns}"
+    versao = hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
+    _versao_memo[caminho] = (assinatura, versao)
+    return versao
+
+
+class CacheRAG:
+    """
+    Os dois níveis do cache do RAG em SQLite, com despejo LRU limitado a
+    `max_itens` entradas por nível. Cada entrada pertence a uma versão do
+    índice; ao detectar outra versão, as tabelas são esvaziadas.
+    """
+
+    def __init__(self, caminho: str, indice: str = chroma_dir, max_itens: int = 1000):
+        self.caminho = caminho
+        self.indice = indice
+        self.max_itens = max_itens
+        self.hits = {"recuperacao": 0, "resposta": 0}
+        self.misses = {"recuperacao": 0, "resposta": 0}
+        self._versao: Optional[str] = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS recuperacao ("
+                " pergunta TEXT PRIMARY KEY, ids TEXT NOT NULL, usado REAL NOT NULL)"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS respostas ("
+                " chave TEXT PRIMARY KEY, resposta TEXT NOT NULL, usado REAL NOT NULL)"
+            )
+            con.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_recuperacao_usado ON recuperacao(usado)")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_respostas_usado ON respostas(usado)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def _verifica_versao(self, con: sqlite3.Connection):
+        versao = versao_indice(self.indice)
+        if versao == self._versao:
+            return
+        linha = con.execute("SELECT valor FROM meta WHERE chave = 'versao_indice'").fetchone()
+        if not linha or linha[0] != versao:
+            con.execute("DELETE FROM recuperacao")
+            con.execute("DELETE FROM respostas")
+            con.execute(
+                "INSERT INTO meta (chave, valor) VALUES ('versao_indice', ?)"
+                " ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+                (versao,),
+            )
+        self._versao = versao
+
+    @staticmethod
+    def chave_resposta(pergunta: str, ids: List[str]) -> str:
+        return hashlib.sha256("\0".join([pergunta, *ids]).encode("utf-8")).hexdigest()
+
+    def _contar(self, nivel: str, acerto: bool):
+        with self._lock:
+            (self.hits if acerto else self.misses)[nivel] += 1
+
+    def recuperacao(self, pergunta: str) -> Optional[List[str]]:
+        """1º nível: ids dos chunks já recuperados para a pergunta normalizada."""
+        with self._conectar() as con:
+            self._verifica_versao(con)
+            linha = con.execute("SELECT ids FROM recuperacao WHERE pergunta = ?", (pergunta,)).fetchone()
+            if linha:
+                con.execute("UPDATE recuperacao SET usado = ? WHERE pergunta = ?", (time.time(), pergunta))
+        self._contar("recuperacao", linha is not None)
+        return json.loads(linha[0]) if linha else None
+
+    def guardar_recuperacao(self, pergunta: str, ids: List[str]):
+        with self._conectar() as con:
+            self._verifica_versao(con)
+            con.execute(
+                "INSERT INTO recuperacao (pergunta, ids, usado) VALUES (?, ?, ?)"
+                " ON CONFLICT(pergunta) DO UPDATE SET ids = excluded.ids, usado = excluded.usado",
+                (pergunta, json.dumps(ids), time.time()),
+            )
+            self._despejar(con, "recuperacao", "pergunta")
+
+    def resposta(self, pergunta: str, ids: List[str]) -> Optional[str]:
+        """2º nível: resposta já gerada para a pergunta sobre exatamente estes chunks."""
+        chave = self.chave_resposta(pergunta, ids)
+        with self._conectar() as con:
+            self._verifica_versao(con)
+            linha = con.execute("SELECT resposta FROM respostas WHERE chave = ?", (chave,)).fetchone()
+            if linha:
+                con.execute("UPDATE respostas SET usado = ? WHERE chave = ?", (time.time(), chave))
+        self._contar("resposta", linha is not None)
+        return linha[0] if linha else None
+
+    def guardar_resposta(self, pergunta: str, ids: List[str], resposta: str):
+        with self._conectar() as con:
+            self._verifica_versao(con)
+            con.execute(
+                "INSERT INTO respostas (chave, resposta, usado) VALUES (?, ?, ?)"
+                " ON CONFLICT(chave) DO UPDATE SET resposta = excluded.resposta, usado = excluded.usado",
+                (self.chave_resposta(pergunta, ids), resposta, time.time()),
+            )
+            self._despejar(con, "respostas", "chave")
+
+    def _despejar(self, con: sqlite3.Connection, tabela: str, coluna: str):
+        con.execute(
+            f"DELETE FROM {tabela} WHERE {coluna} NOT IN"
+            f" (SELECT {coluna} FROM {tabela} ORDER BY usado DESC LIMIT ?)",
+            (self.max_itens,),
+        )
+
+    def limpar(self):
+        with self._conectar() as con:
+            con.execute("DELETE FROM recuperacao")
+            con.execute("DELETE FROM respostas")
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._conectar() as con:
+            self._verifica_versao(con)
+            itens = {
+                "recuperacao": con.execute("SELECT COUNT(*) FROM recuperacao").fetchone()[0],
+                "resposta": con.execute("SELECT COUNT(*) FROM respostas").fetchone()[0],
+            }
+        with self._lock:
+            resumo = {"max_itens": self.max_itens, "versao_indice": self._versao}
+            for nivel, n in itens.items():
+                total = self.hits[nivel] + self.misses[nivel]
+                resumo[nivel] = {
+                    "itens": n,
+                    "hits": self.hits[nivel],
+                    "misses": self.misses[nivel],
+                    "taxa_acerto": round(self.hits[nivel] / total, 4) if total else 0.0,
+                }
+            return resumo
+
+
+class RAG:
+    """Recuperação no Chroma e geração da resposta, em etapas separadas para o cache."""
+
+    def __init__(self):
+        from langchain_chroma import Chroma
+        from langchain.chains.question_answering import load_qa_chain
+        from langchain_openai import ChatOpenAI
+        from ingest.embeddings import embeddings_da_base
+
+        self.versao = versao_indice()
+        # mesmo provedor de embeddings usado na indexação (ver ingest/embeddings.py)
+        self.embeddings = embeddings_da_base(chroma_dir)
+        self.db = Chroma(persist_directory=chroma_dir, embedding_function=self.embeddings)
+        self.cadeia = load_qa_chain(
+            ChatOpenAI(openai_api_key=os.getenv("OPENAI_API_KEY"), temperature=0), chain_type="stuff"
+        )
+
+    def recuperar(self, pergunta: str, k: int = K_DOCUMENTOS) -> List[str]:
+        """Ids dos k chunks vetorialmente mais próximos da pergunta."""
+        embedding = self.embeddings.embed_query(pergunta)
+        resultado = self.db._collection.query(query_embeddings=[embedding], n_results=k, include=[])
+        return resultado["ids"][0]
+
+    def documentos(self, ids: List[str]) -> list:
+        from langchain_core.documents import Document
+
+        encontrados = self.db._collection.get(ids=ids, include=["documents", "metadatas"])
+        por_id = {
+            i: Document(page_content=texto, metadata=meta or {})
+            for i, texto, meta in zip(encontrados["ids"], encontrados["documents"], encontrados["metadatas"])
+        }
+        return [por_id[i] for i in ids if i in por_id]
+
+    def responder(self, pergunta: str, ids: List[str]) -> str:
+        return self.cadeia.run(input_documents=self.documentos(ids), question=pergunta)
+
+
+_rag: Optional[RAG] = None
+_rag_lock = threading.Lock()
+_cache: Optional[CacheRAG] = None
+_cache_lock = threading.Lock()
+_lexico: Tuple[Optional[str], Optional[IndiceBM25]] = (None, None)
+_lexico_lock = threading.Lock()
+
+
+def obter_rag() -> RAG:
+    """
+    RAG compartilhado pelo processo, criado uma única vez (thread-safe) e
+    recriado se a base for reindexada enquanto o processo roda.
+    """
+    global _rag
+    if _rag is None or _rag.versao != versao_indice():
+        with _rag_lock:
+            if _rag is None or _rag.versao != versao_indice():
+                _rag = RAG()
+    return _rag
+
+
+def obter_cache() -> CacheRAG:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheRAG(
+                    os.getenv("RAG_CACHE_PATH", os.path.join(chroma_dir, "cache_rag.db")),
+                    max_itens=int(os.getenv("RAG_CACHE_MAX", "1000")),
+                )
+    return _cache
+
+
+def obter_indice_lexico() -> Optional[IndiceBM25]:
+    """Índice BM25 da base atual (recarregado após reindexação); None se não existir."""
+    global _lexico
+    versao = versao_indice()
+    if _lexico[0] != versao:
+        with _lexico_lock:
+            if _lexico[0] != versao:
+                _lexico = (versao, IndiceBM25.carregar(chroma_dir))
+    return _lexico[1]
+
+
+def consulta_lexical(pergunta: str) -> bool:
+    """
+    Perguntas que o BM25 resolve sozinho: as que citam um código CBO e as
+    curtas centradas numa sigla ("o que é FGTS?", "alíquota do INSS").
+    """
+    termos = termos_lexicos(pergunta)
+    if any(_CODIGO_CBO.fullmatch(t) for t in termos):
+        return True
+    maiusculas = {t.lower() for t in re.findall(r"\b[A-Z]{2,6}\b", pergunta or "")}
+    relevantes = [t for t in termos if t not in PALAVRAS_VAZIAS]
+    return any(t in SIGLAS or t in maiusculas for t in relevantes) and len(relevantes) <= MAX_TERMOS_LEXICAL
+
+
+def fundir_rrf(rankings: List[List[str]], k: int = RRF_K) -> List[str]:
+    """Reciprocal rank fusion: soma de 1 / (k + posição) em cada ranking."""
+    pontuacao: Dict[str, float] = {}
+    for ranking in rankings:
+        for posicao, i in enumerate(ranking, start=1):
+            pontuacao[i] = pontuacao.get(i, 0.0) + 1.0 / (k + posicao)
+    return sorted(pontuacao, key=pontuacao.get, reverse=True)
+
+
+def recuperar(pergunta: str, k: int = K_DOCUMENTOS) -> List[str]:
+    """
+    Ids dos k chunks para a pergunta. Sem índice BM25 (ou com RAG_HIBRIDO=0)
+    a busca é só vetorial; na via só lexical nenhum embedding é calculado.
+    """
+    lexico = obter_indice_lexico() if HIBRIDO else None
+    if lexico is None:
+        return obter_rag().recuperar(pergunta, k)
+    lexicos = [i for i, _ in lexico.buscar(pergunta, k * CANDIDATOS)]
+    if lexicos and consulta_lexical(pergunta):
+        return lexicos[:k]
+    vetoriais = obter_rag().recuperar(pergunta, k * CANDIDATOS)
+    return fundir_rrf([vetoriais, lexicos])[:k]
+
+
+def consultar(pergunta: str) -> str:
+    """
+    Responde à pergunta consultando os dois níveis do cache antes de
+    calcular embeddings, buscar no Chroma ou chamar o modelo.
+    """
+    cache = obter_cache()
+    chave = normalizar_pergunta(pergunta)
+    ids = cache.recuperacao(chave)
+    if ids is None:
+        ids = recuperar(pergunta)
+        cache.guardar_recuperacao(chave, ids)
+    resposta = cache.resposta(chave, ids)
+    if resposta is None:
+        resposta = obter_rag().responder(pergunta, ids)
+        cache.guardar_resposta(chave, ids, resposta)
+    return resposta
+
+
+def aquecer_rag(em_segundo_plano: bool = True):
+    """
+    Gancho opcional de aquecimento: cria o RAG antes da primeira pergunta.
+    Em segundo plano não bloqueia quem chama; falhas ficam para a consulta real.
+    """
+    if not em_segundo_plano:
+        obter_rag()
+        return None
+
+    def aquecer():
+        try:
+            obter_rag()
+        except Exception as e:
+            print(f"AVISO: falha ao aquecer o RAG: {e}")
+
+    thread = threading.Thread(target=aquecer, name="aquecer-rag", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,160 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# ------------------------------------------------------------------
+# Registro das tools: cada função declara seu schema uma única vez
+# (via @ferramenta) e daqui saem a lista `tools` enviada ao modelo,
+# a tabela de despacho e os validadores de argumentos.
+# ------------------------------------------------------------------
+
+# Parâmetro "colaborador" (e-mail ou PIS) das funções da folha. Só a aplicação
+# o preenche (ver dispatcher): ele fica fora do schema enviado ao modelo, que
+# assim não pode escolher consultar a folha de outra pessoa.
+parametro_colaborador = {"type": ["string", "null"]}
+
+TIPOS_JSON = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def _compilar_tipo(nome: str, schema: dict) -> Callable[[Any], Any]:
+    """Valida (e normaliza) um valor contra o schema de uma propriedade."""
+    tipos = schema.get("type", [])
+    tipos = [tipos] if isinstance(tipos, str) else list(tipos)
+    aceitos = tuple(t for tipo in tipos for t in TIPOS_JSON[tipo])
+    inteiro = "integer" in tipos and "number" not in tipos
+    itens = _compilar_tipo(f"{nome}[]", schema["items"]) if "items" in schema else None
+    objeto = _compilar_objeto(schema) if "properties" in schema else None
+    opcoes = set(schema["enum"]) if "enum" in schema else None
+
+    def validar(valor):
+        if inteiro and isinstance(valor, str) and valor.strip().lstrip("-").isdigit():
+            valor = int(valor)
+        if inteiro and isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)
+        if not isinstance(valor, aceitos) or (isinstance(valor, bool) and bool not in aceitos):
+            raise ValueError(f"Argumento '{nome}' deve ser do tipo {' ou '.join(tipos)}.")
+        if opcoes is not None and valor not in opcoes:
+            raise ValueError(f"Argumento '{nome}' inválido. Use: {', '.join(map(str, schema['enum']))}.")
+        if itens is not None and isinstance(valor, list):
+            valor = [itens(v) for v in valor]
+        if objeto is not None and isinstance(valor, dict):
+            valor = objeto(valor)
+        return valor
+
+    return validar
+
+
+def _compilar_objeto(schema: dict) -> Callable[[dict], dict]:
+    """
+    Pré-compila o validador dos argumentos de um objeto: argumentos
+    desconhecidos e obrigatórios ausentes viram ValueError; propriedades
+    que aceitam null podem ser omitidas.
+    """
+    propriedades = {nome: _compilar_tipo(nome, p) for nome, p in schema.get("properties", {}).items()}
+    anulaveis = {nome for nome, p in schema.get("properties", {}).items() if "null" in p.get("type", [])}
+    obrigatorios = [nome for nome in schema.get("required", []) if nome not in anulaveis]
+
+    def validar(argumentos: dict) -> dict:
+        if not isinstance(argumentos, dict):
+            raise ValueError("Os argumentos devem ser um objeto JSON.")
+        desconhecidos = set(argumentos) - set(propriedades)
+        if desconhecidos:
+            raise ValueError(f"Argumento(s) desconhecido(s): {', '.join(sorted(desconhecidos))}.")
+        faltando = [nome for nome in obrigatorios if nome not in argumentos]
+        if faltando:
+            raise ValueError(f"Argumento(s) obrigatório(s) ausente(s): {', '.join(faltando)}.")
+        return {nome: propriedades[nome](valor) for nome, valor in argumentos.items()}
+
+    return validar
+
+
+class Ferramenta:
+    """Uma tool registrada: função, schema OpenAI, validador e estatísticas de execução."""
+
+    def __init__(self, funcao: Callable, descricao: str, parametros: Dict[str, dict],
+                 colaborador: bool = True, cache: bool = True):
+        self.nome = funcao.__name__
+        self.funcao = funcao
+        self.colaborador = colaborador
+        self.cache = cache
+        propriedades = dict(parametros)
+        self.schema = {
+            "type": "function",
+            "function": {
+                "name": self.nome,
+                "description": descricao,
+                "parameters": {
+                    "type": "object",
+                    "properties": propriedades,
+                    "required": list(propriedades),
+                    "additionalProperties": False,
+                },
+                "strict": True,
+            },
+        }
+        internos = dict(propriedades, colaborador=parametro_colaborador) if colaborador else propriedades
+        self.validar = _compilar_objeto({"properties": internos, "required": list(propriedades)})
+        self.chamadas = 0
+        self.erros = 0
+        self.tempo_total = 0.0
+        self._lock = threading.Lock()
+
+    def executar(self, argumentos: dict) -> dict:
+        """Valida os argumentos, executa a função e contabiliza tempo e erros."""
+        inicio = time.perf_counter()
+        resultado = self.funcao(**self.validar(argumentos))
+        self.registrar(time.perf_counter() - inicio, resultado)
+        return resultado
+
+    def registrar(self, segundos: float, resultado: Any = None):
+        with self._lock:
+            self.chamadas += 1
+            self.tempo_total += segundos
+            if isinstance(resultado, dict) and resultado.get("erro"):
+                self.erros += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "chamadas": self.chamadas,
+                "erros": self.erros,
+                "tempo_medio_ms": round(self.tempo_total / self.chamadas * 1000, 3) if self.chamadas else 0.0,
+            }
+
+
+# nome da tool -> Ferramenta (despacho em tempo constante)
+FERRAMENTAS: Dict[str, Ferramenta] = {}
+
+
+def ferramenta(descricao: str, colaborador: bool = True, cache: bool = True, **parametros: dict):
+    """
+    Registra a função decorada como tool. Os parâmetros são declarados como
+    propriedades JSON Schema; a função também recebe "colaborador", injetado
+    pela aplicação e ausente do schema, salvo quando `colaborador=False`.
+    `cache=False` marca tools cujo resultado não depende só dos argumentos
+    e da folha.
+    """
+    def registrar(funcao: Callable) -> Callable:
+        item = Ferramenta(funcao, descricao, parametros, colaborador=colaborador, cache=cache)
+        if item.nome in FERRAMENTAS:
+            raise ValueError(f"Tool '{item.nome}' registrada duas vezes.")
+        FERRAMENTAS[item.nome] = item
+        return funcao
+    return registrar
+
+
+def gerar_tools() -> List[dict]:
+    """Lista de schemas no formato esperado pela API da OpenAI."""
+    return [item.schema for item in FERRAMENTAS.values()]
+
+
+def estatisticas_tools() -> Dict[str, Dict[str, Any]]:
+    return {nome: item.estatisticas() for nome, item in FERRAMENTAS.items()}
@@ -0,0 +1,145 @@
+import os
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+from .tools import tools
+
+# ------------------------------------------------------------------
+# Roteador de tools: envia ao modelo só as funções relevantes à pergunta
+# ------------------------------------------------------------------
+ROTEADOR_ATIVO = os.getenv("ROTEADOR_TOOLS", "1") != "0"
+
+
+def limpar_schema(valor: Any) -> Any:
+    """Remove chaves fora do padrão OpenAI (ex.: `_old_description`) de um schema."""
+    if isinstance(valor, dict):
+        return {k: limpar_schema(v) for k, v in valor.items() if not k.startswith("_")}
+    if isinstance(valor, list):
+        return [limpar_schema(v) for v in valor]
+    return valor
+
+
+tools_limpas = [limpar_schema(t) for t in tools]
+tools_por_nome = {t["function"]["name"]: t for t in tools_limpas}
+
+# Sempre enviadas: baratas e úteis para qualquer pergunta
+TOOLS_FIXAS = ["get_informacoesCabecalho"]
+
+# Famílias de tools → prefixos de palavras (sem acento, minúsculas) que as ativam.
+# Um prefixo casa com qualquer palavra que comece com ele ("cresc" → "cresceu");
+# frases casam apenas com palavras inteiras ("maio" não casa com "maior").
+FAMILIAS = {
+    "documento": {
+        "tools": ["consultar_documento_txt_ou_pdf"],
+        "palavras": ["fgts", "pis", "irrf", "inss", "cbo", "clt", "lei", "direito", "explic",
+                     "signific", "conceito", "document", "regra", "calcul", "funciona", "defin"],
+        "frases": ["o que e", "o que sao", "como funciona", "para que serve"],
+    },
+    "cbo": {
+        "tools": ["consultar_cbo"],
+        "palavras": ["cbo", "ocupac", "profiss", "cargo"],
+        "frases": [],
+    },
+    "cabecalho": {
+        "tools": ["get_informacoesCabecalho"],
+        "palavras": ["coluna", "campo", "cabecalho", "disponive"],
+        "frases": [],
+    },
+    "media": {
+        "tools": ["consultar_serie"],
+        "palavras": ["media", "medio"],
+        "frases": [],
+    },
+    "maior": {
+        "tools": ["consultar_serie"],
+        "palavras": ["maior", "maxim", "pico", "recorde"],
+        "frases": ["mais alto", "mais alta"],
+    },
+    "menor": {
+        "tools": ["consultar_serie"],
+        "palavras": ["menor", "minim"],
+        "frases": ["mais baixo", "mais baixa"],
+    },
+    "total": {
+        "tools": ["consultar_serie"],
+        "palavras": ["total", "soma", "somator", "acumul", "quanto"],
+        "frases": [],
+    },
+    "evolucao": {
+        "tools": ["consultar_serie", "get_Evolucao"],
+        "palavras": ["evolu", "histor", "tendenc", "variac", "grafico"],
+        "frases": ["ao longo", "mes a mes"],
+    },
+    "crescimento": {
+        "tools": ["consultar_serie"],
+        "palavras": ["cresc", "aument", "reajust", "percentual", "diminu", "redu", "caiu", "queda"],
+        "frases": [],
+    },
+    "mes_ano": {
+        "tools": ["get_Mes_Ano"],
+        "palavras": [],
+        "frases": ["janeiro", "fevereiro", "marco", "abril", "maio", "junho", "julho",
+                   "agosto", "setembro", "outubro", "novembro", "dezembro", "mes"],
+    },
+    "resumo": {
+        "tools": ["get_Resumo_Descontos_Periodo", "get_Resumo_Vencimentos_Periodo", "get_Resumo_Folha_Periodo"],
+        "palavras": ["resum", "desconto", "vencimento", "folha", "holerite", "contracheque", "liquido", "bruto"],
+        "frases": [],
+    },
+    "participacao": {
+        "tools": ["get_Participacao_Vencimentos"],
+        "palavras": ["particip", "composic", "proporc", "pizza", "distribu", "fatia"],
+        "frases": [],
+    },
+}
+
+
+def normalizar_texto(texto: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.findall(r"\w+", sem_acento.lower()))
+
+
+def classificar(pergunta: str) -> List[str]:
+    """Famílias de tools cujas palavras-chave aparecem na pergunta."""
+    texto = normalizar_texto(pergunta)
+    palavras = texto.split()
+    encontradas = []
+    for familia, regra in FAMILIAS.items():
+        if any(f" {frase} " in f" {texto} " for frase in regra["frases"]) or any(
+            p.startswith(prefixo) for prefixo in regra["palavras"] for p in palavras
+        ):
+            encontradas.append(familia)
+    return encontradas
+
+
+def _campo(obj: Any, nome: str) -> Any:
+    return obj.get(nome) if isinstance(obj, dict) else getattr(obj, nome, None)
+
+
+def _tools_do_ultimo_turno(historico: Optional[Iterable[Any]]) -> List[str]:
+    """Nomes das tools chamadas pelo assistente na interação anterior (perguntas de continuação)."""
+    for mensagem in reversed(list(historico or [])):
+        chamadas = _campo(mensagem, "tool_calls")
+        if _campo(mensagem, "role") == "assistant" and chamadas:
+            return [_campo(_campo(tc, "function"), "name") for tc in chamadas]
+    return []
+
+
+def selecionar_tools(pergunta: str, historico: Optional[Iterable[Any]] = None) -> List[Dict]:
+    """
+    Subconjunto de tools para a pergunta. Sem palavras-chave reconhecidas,
+    reaproveita as famílias usadas no turno anterior; sem isso, envia todas.
+    """
+    if not ROTEADOR_ATIVO:
+        return tools_limpas
+
+    nomes = [nome for familia in classificar(pergunta) for nome in FAMILIAS[familia]["tools"]]
+    if not nomes:
+        anteriores = set(_tools_do_ultimo_turno(historico))
+        nomes = [nome for regra in FAMILIAS.values() if anteriores & set(regra["tools"]) for nome in regra["tools"]]
+    if not nomes:
+        return tools_limpas
+
+    selecionadas = dict.fromkeys(TOOLS_FIXAS + nomes)
+    return [tools_por_nome[nome] for nome in selecionadas if nome in tools_por_nome]
@@ -0,0 +1,218 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# ------------------------------------------------------------------
+# Gráficos do /grafico
+# Por padrão o cliente recebe uma especificação Plotly (JSON) e desenha
+# o gráfico ele mesmo. Imagens só são geradas quando pedidas no Accept:
+# cada insight vira uma Figure própria (API orientada a objetos, backend
+# Agg), sem o estado global do pyplot: é seguro em paralelo e roda num
+# pool de processos. As imagens ficam num cache LRU limitado em bytes,
+# chaveado pelo hash do insight e das opções de saída.
+# ------------------------------------------------------------------
+FORMATOS = {"png": "image/png", "svg": "image/svg+xml", "webp": "image/webp"}
+
+LARGURA_PADRAO = 800     # pixels
+ALTURA_PADRAO = 400
+DPI = 100
+MAX_LADO = int(os.getenv("GRAFICOS_MAX_PIXELS", "2000"))    # lado máximo da imagem, em pixels
+MAX_PONTOS = int(os.getenv("GRAFICOS_MAX_PONTOS", "5000"))  # pontos (ou fatias) por gráfico
+PROCESSOS = int(os.getenv("GRAFICOS_PROCESSOS", str(min(4, os.cpu_count() or 1))))
+
+
+# mesmo visual das páginas Streamlit (ver ui/pages/2_Insights_Personalizados.py)
+LAYOUT_PADRAO = {"margin": {"t": 40, "b": 40, "l": 20, "r": 20}, "height": 400}
+
+
+def spec_plotly(insight: Dict[str, Any]) -> Dict[str, Any]:
+    """Figura Plotly (data + layout) do insight, pronta para plotly.io.from_json ou Plotly.newPlot."""
+    tipo = insight["tipo"]
+    layout = {"title": {"text": insight["titulo"]}, **LAYOUT_PADRAO}
+    if tipo == "pizza":
+        dados = [{
+            "type": "pie",
+            "labels": [d["label"] for d in insight["dados"]],
+            "values": [d["value"] for d in insight["dados"]],
+            "hole": 0.3,
+        }]
+    else:
+        traco = {"type": "scatter", "mode": "lines+markers"} if tipo == "linha" else {"type": "bar"}
+        dados = [{**traco, "x": insight["eixo_x"], "y": insight["dados"]}]
+        layout.update(xaxis={"title": {"text": ""}}, yaxis={"title": {"text": insight["eixo_y"]}})
+    return {"data": dados, "layout": layout}
+
+
+def negociar_formato(accept: Optional[str]) -> Optional[str]:
+    """
+    Formato de imagem pedido no cabeçalho Accept (png, svg ou webp), ou
+    None quando o cliente aceita JSON (padrão: especificação do gráfico).
+    """
+    opcoes = []
+    for posicao, item in enumerate((accept or "").split(",")):
+        partes = [p.strip() for p in item.split(";")]
+        q = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        if partes[0] and q > 0:
+            opcoes.append((-q, posicao, partes[0].lower()))
+    por_tipo = {tipo: formato for formato, tipo in FORMATOS.items()}
+    for _, _, tipo in sorted(opcoes):
+        if tipo in por_tipo:
+            return por_tipo[tipo]
+        if tipo in ("application/json", "*/*", "application/*"):
+            return None
+    return None
+
+
+def validar_opcoes(formato: str, largura: int, altura: int):
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato '{formato}' inválido. Use: {', '.join(FORMATOS)}.")
+    if not (100 <= largura <= MAX_LADO and 100 <= altura <= MAX_LADO):
+        raise ValueError(f"Largura e altura devem estar entre 100 e {MAX_LADO} pixels.")
+
+
+def renderizar(insight: Dict[str, Any], formato: str = "png",
+               largura: int = LARGURA_PADRAO, altura: int = ALTURA_PADRAO) -> bytes:
+    """Desenha um insight (linha, barra ou pizza) e devolve a imagem codificada."""
+    from matplotlib.figure import Figure
+
+    tipo = insight["tipo"]
+    if len(insight.get("dados") or []) > MAX_PONTOS:
+        raise ValueError(f"O gráfico '{insight['titulo']}' excede {MAX_PONTOS} pontos.")
+
+    fig = Figure(figsize=(largura / DPI, altura / DPI), dpi=DPI)
+    ax = fig.subplots()
+    if tipo == "linha":
+        ax.plot(insight["eixo_x"], insight["dados"], marker="o")
+        ax.set_ylabel(insight["eixo_y"])
+    elif tipo == "barra":
+        ax.bar(insight["eixo_x"], insight["dados"])
+        ax.set_ylabel(insight["eixo_y"])
+    elif tipo == "pizza":
+        labels = [d["label"] for d in insight["dados"]]
+        vals = [d["value"] for d in insight["dados"]]
+        ax.pie(vals, labels=labels, autopct="%1.1f%%")
+    ax.set_title(insight["titulo"])
+    if tipo != "pizza":
+        ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=formato)
+    return buf.getvalue()
+
+
+def chave_grafico(insight: Dict[str, Any], formato: str, largura: int, altura: int) -> str:
+    canonico = json.dumps([insight, formato, largura, altura], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonico.encode("utf-8")).hexdigest()
+
+
+class CacheGraficos:
+    """Cache LRU de imagens renderizadas, limitado pelo total de bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._itens: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        with self._lock:
+            imagem = self._itens.get(chave)
+            if imagem is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return imagem
+
+    def guardar(self, chave: str, imagem: bytes):
+        if len(imagem) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._itens[chave] = imagem
+            self.bytes += len(imagem)
+            while self.bytes > self.max_bytes:
+                self.bytes -= len(self._itens.popitem(last=False)[1])
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "itens": len(self._itens),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+cache_graficos = CacheGraficos(max_bytes=int(float(os.getenv("GRAFICOS_CACHE_MB", "32")) * 1024 * 1024))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de processos criado na primeira renderização; GRAFICOS_PROCESSOS=0
+    renderiza na própria thread. Os workers nascem por spawn: a API já tem
+    outras threads, e um fork poderia herdar um lock preso por uma delas.
+    """
+    global _pool
+    if PROCESSOS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=PROCESSOS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def renderizar_lote(insights: List[Dict[str, Any]], formato: str = "png",
+                    largura: int = LARGURA_PADRAO, altura: int = ALTURA_PADRAO) -> List[bytes]:
+    """
+    Imagens dos insights, na mesma ordem. As que já estão em cache são
+    reaproveitadas; as demais são desenhadas em paralelo no pool.
+    """
+    validar_opcoes(formato, largura, altura)
+    chaves = [chave_grafico(ins, formato, largura, altura) for ins in insights]
+    imagens: List[Optional[bytes]] = [cache_graficos.obter(chave) for chave in chaves]
+    pendentes = [i for i, imagem in enumerate(imagens) if imagem is None]
+
+    pool = _obter_pool()
+    if pool is None:
+        for i in pendentes:
+            imagens[i] = renderizar(insights[i], formato, largura, altura)
+    else:
+        futuros = {i: pool.submit(renderizar, insights[i], formato, largura, altura) for i in pendentes}
+        for i, futuro in futuros.items():
+            imagens[i] = futuro.result()
+    for i in pendentes:
+        cache_graficos.guardar(chaves[i], imagens[i])
+    return imagens
+
+
+def encerrar():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
@@ -0,0 +1,128 @@
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# ------------------------------------------------------------------
+# Índice código CBO -> título, extraído de documentos/CBO.pdf na ingestão.
+# Gravado como dois arrays ordenados (.npz ao lado da base vetorial): uma
+# consulta é uma busca binária, sem embeddings nem modelo.
+# As chaves são só os dígitos do código; o nível na hierarquia da CBO 2002
+# sai do comprimento (1 grande grupo ... 6 ocupação).
+# ------------------------------------------------------------------
+ARQUIVO_CBO = "cbo.npz"
+DOCUMENTO_CBO = "CBO.pdf"
+VERSAO_FORMATO = 2      # 2: títulos normalizados (NFKC); índices anteriores são refeitos na ingestão
+
+NIVEIS = {
+    1: "grande grupo",
+    2: "subgrupo principal",
+    3: "subgrupo",
+    4: "família ocupacional",
+    6: "ocupação",
+}
+
+# "2410-05 - Advogado", "3222 - Técnicos e auxiliares de enfermagem ...",
+# e linhas de tabela "1421Gerentes administrativos e financeiros124.165"
+_LINHA_CODIGO = re.compile(r"^(\d{4}(?:-\d{2})?)\s*(?:-\s+)?([A-ZÀ-Ý][^\d]*?)\s*(?:[\d.]+)?$")
+# linha da tabela de grandes grupos: "2Profissionais das ciências e das artes4"
+_LINHA_GRANDE_GRUPO = re.compile(r"^(\d)\s*([A-ZÀ-Ý][^\d]*?)\s*\d?$")
+_RODAPE = re.compile(r"Ministério do Trabalho|Informações Gerais|\d+ of \d+|^\d{2}/\d{2}/\d{4}")
+
+
+def _continua(linha: str) -> bool:
+    """Linha que prossegue o título da anterior (quebra de linha do PDF)."""
+    return bool(linha) and linha[0].islower()
+
+
+def extrair_cbo(texto: str) -> Dict[str, str]:
+    """Pares dígitos do código -> título encontrados no texto do documento da CBO."""
+    # o PDF usa ligaduras tipográficas ("ﬁ" em "Proﬁssionais"): NFKC as desfaz
+    texto = unicodedata.normalize("NFKC", texto)
+    linhas = [l.strip() for l in texto.splitlines() if l.strip() and not _RODAPE.search(l)]
+    codigos: Dict[str, str] = {}
+
+    for i, linha in enumerate(linhas):
+        m = _LINHA_CODIGO.match(linha)
+        if m:
+            titulo = m.group(2)
+            for seguinte in linhas[i + 1:i + 3]:
+                if not _continua(seguinte):
+                    break
+                titulo += " " + seguinte
+            codigos.setdefault(m.group(1).replace("-", ""), titulo.strip(" .-"))
+
+    # tabela "Grandes Grupos / Títulos": código de um dígito, título em uma ou
+    # mais linhas curtas e o nível de competência (número ou "Não definido")
+    inicio = next((i for i, l in enumerate(linhas) if "Grandes Grupos" in l), None)
+    aberto = None
+    for linha in linhas[inicio + 1:] if inicio is not None else []:
+        m = _LINHA_GRANDE_GRUPO.match(linha)
+        if m:
+            aberto = None if linha[-1].isdigit() else m.group(1)
+            codigos.setdefault(m.group(1), m.group(2))
+        elif len(linha) > 60 and "0" in codigos:
+            break                                   # fim da tabela: volta o texto corrido
+        elif aberto and linha[0].isalpha() and not linha.startswith("Não de"):
+            codigos[aberto] += " " + linha
+        else:
+            aberto = None
+    return codigos
+
+
+def formatar_codigo(digitos: str) -> str:
+    return f"{digitos[:4]}-{digitos[4:]}" if len(digitos) == 6 else digitos
+
+
+class IndiceCBO:
+    """Códigos (só dígitos) ordenados e seus títulos."""
+
+    def __init__(self, codigos: np.ndarray, titulos: np.ndarray):
+        self.codigos = codigos
+        self.titulos = titulos
+
+    @classmethod
+    def construir(cls, pares: Dict[str, str]) -> "IndiceCBO":
+        chaves = sorted(pares)
+        return cls(np.array(chaves, dtype=str), np.array([pares[c] for c in chaves], dtype=str))
+
+    def salvar(self, diretorio: str):
+        os.makedirs(diretorio, exist_ok=True)
+        tmp = os.path.join(diretorio, ARQUIVO_CBO + ".tmp.npz")
+        np.savez(tmp, codigos=self.codigos, titulos=self.titulos, versao=np.array(VERSAO_FORMATO))
+        os.replace(tmp, os.path.join(diretorio, ARQUIVO_CBO))
+
+    @classmethod
+    def carregar(cls, diretorio: str) -> Optional["IndiceCBO"]:
+        """Índice gravado na ingestão, ou None se não existir ou for de um formato anterior."""
+        try:
+            with np.load(os.path.join(diretorio, ARQUIVO_CBO)) as a:
+                if "versao" not in a.files or int(a["versao"]) != VERSAO_FORMATO:
+                    return None
+                return cls(a["codigos"], a["titulos"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def titulo(self, digitos: str) -> Optional[str]:
+        i = np.searchsorted(self.codigos, digitos)
+        if i < len(self.codigos) and self.codigos[i] == digitos:
+            return str(self.titulos[i])
+        return None
+
+    def resolver(self, cbo: str) -> List[Dict[str, str]]:
+        """
+        Hierarquia conhecida do código, do nível mais específico ao grande
+        grupo: [{"codigo", "nivel", "titulo"}]. Vazia se nada for encontrado.
+        """
+        digitos = re.sub(r"\D", "", str(cbo or ""))
+        hierarquia = []
+        for tamanho in sorted(NIVEIS, reverse=True):
+            if len(digitos) >= tamanho:
+                titulo = self.titulo(digitos[:tamanho])
+                if titulo:
+                    hierarquia.append(
+                        {"codigo": formatar_codigo(digitos[:tamanho]), "nivel": NIVEIS[tamanho], "titulo": titulo}
+                    )
+        return hierarquia
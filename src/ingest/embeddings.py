@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import List, Optional
+
+import numpy as np
+
+# ------------------------------------------------------------------
+# Provedores de embeddings intercambiáveis (indexação e consulta do RAG).
+# Qualquer objeto com embed_documents/embed_query serve ao Chroma.
+# EMBEDDINGS_BACKEND escolhe o provedor: openai | local[:dimensão].
+# ------------------------------------------------------------------
+ARQUIVO_MANIFESTO = "manifesto_ingestao.json"
+ARQUIVO_IDF = "idf_local.npy"
+DIMENSAO_LOCAL = int(os.getenv("EMBEDDINGS_LOCAL_DIM", "1024"))
+
+
+class EmbeddingsLocais:
+    """
+    Embeddings TF-IDF com hashing, calculados na CPU e sem rede. Palavras e
+    bigramas são projetados por hashing (com sinal) em `dimensao` posições.
+    Os documentos recebem só log-TF normalizado, o que os torna independentes
+    do corpus e permite indexação incremental; o IDF entra ao quadrado no
+    vetor da consulta, de modo que o produto interno pondera cada termo por
+    idf². Mesmo texto => mesmo vetor, em qualquer processo ou máquina.
+    """
+
+    def __init__(self, dimensao: int = DIMENSAO_LOCAL, idf: Optional[np.ndarray] = None):
+        self.dimensao = dimensao
+        self.idf = idf if idf is not None and len(idf) == dimensao else None
+
+    @staticmethod
+    def _tokens(texto: str) -> List[str]:
+        sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+        palavras = re.findall(r"\w+", sem_acento.lower())
+        return palavras + [f"{a} {b}" for a, b in zip(palavras, palavras[1:])]
+
+    def _termos(self, texto: str) -> tuple:
+        """Posições e pesos log-TF (com sinal) dos termos do texto."""
+        contagem = {}
+        for termo in self._tokens(texto):
+            contagem[termo] = contagem.get(termo, 0) + 1
+        posicoes = np.empty(len(contagem), dtype=np.int64)
+        pesos = np.empty(len(contagem), dtype=np.float32)
+        for j, (termo, n) in enumerate(contagem.items()):
+            h = int.from_bytes(hashlib.blake2b(termo.encode("utf-8"), digest_size=8).digest(), "little")
+            posicoes[j] = h % self.dimensao
+            pesos[j] = (1.0 + np.log(n)) * (1.0 if (h >> 63) & 1 else -1.0)
+        return posicoes, pesos
+
+    def _vetor(self, texto: str, ponderacao: Optional[np.ndarray] = None) -> List[float]:
+        vetor = np.zeros(self.dimensao, dtype=np.float32)
+        posicoes, pesos = self._termos(texto)
+        np.add.at(vetor, posicoes, pesos)
+        if ponderacao is not None:
+            vetor *= ponderacao
+        norma = np.linalg.norm(vetor)
+        return (vetor / norma if norma else vetor).tolist()
+
+    def embed_documents(self, textos: List[str]) -> List[List[float]]:
+        return [self._vetor(t) for t in textos]
+
+    def embed_query(self, texto: str) -> List[float]:
+        return self._vetor(texto, None if self.idf is None else self.idf ** 2)
+
+    def calcular_idf(self, textos: List[str]) -> np.ndarray:
+        """IDF suavizado por posição do hashing, a partir dos textos indexados."""
+        df = np.zeros(self.dimensao, dtype=np.float64)
+        for texto in textos:
+            df[np.unique(self._termos(texto)[0])] += 1
+        return (np.log((1 + len(textos)) / (1 + df)) + 1).astype(np.float32)
+
+    def salvar_idf(self, diretorio: str, idf: np.ndarray):
+        os.makedirs(diretorio, exist_ok=True)
+        tmp = os.path.join(diretorio, ARQUIVO_IDF + ".tmp.npy")
+        np.save(tmp, idf)
+        os.replace(tmp, os.path.join(diretorio, ARQUIVO_IDF))
+        self.idf = idf
+
+
+def nome_embeddings(nome: Optional[str] = None) -> str:
+    """Nome canônico do provedor (o que vai para o manifesto): openai | local:<dimensão>."""
+    nome = (nome or os.getenv("EMBEDDINGS_BACKEND", "openai")).strip().lower()
+    if nome.startswith("local"):
+        dimensao = nome.split(":", 1)[1] if ":" in nome else DIMENSAO_LOCAL
+        return f"local:{int(dimensao)}"
+    if nome == "openai":
+        return nome
+    raise ValueError(f"Provedor de embeddings '{nome}' desconhecido. Use: openai, local.")
+
+
+def criar_embeddings(nome: Optional[str] = None, diretorio: Optional[str] = None):
+    """
+    Instancia o provedor de embeddings. Para o local, `diretorio` (a base
+    Chroma) fornece o IDF gravado na última indexação.
+    """
+    nome = nome_embeddings(nome)
+    if nome.startswith("local:"):
+        idf = None
+        caminho_idf = os.path.join(diretorio, ARQUIVO_IDF) if diretorio else None
+        if caminho_idf and os.path.exists(caminho_idf):
+            idf = np.load(caminho_idf)
+        return EmbeddingsLocais(int(nome.split(":", 1)[1]), idf=idf)
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def embeddings_da_base(diretorio: str):
+    """
+    Provedor com que a base em `diretorio` foi indexada (lido do manifesto),
+    para que a consulta use o mesmo espaço vetorial da indexação.
+    Sem manifesto, vale EMBEDDINGS_BACKEND.
+    """
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            indexado = json.load(f)["config"]["embeddings"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return criar_embeddings(None, diretorio)
+    if os.getenv("EMBEDDINGS_BACKEND") and nome_embeddings() != indexado:
+        print(f"AVISO: base indexada com '{indexado}'; EMBEDDINGS_BACKEND ignorado nas consultas.")
+    return criar_embeddings(indexado, diretorio)
@@ -0,0 +1,99 @@
+import math
+import os
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# ------------------------------------------------------------------
+# Índice invertido BM25 dos chunks (busca lexical do RAG).
+# Gerado na ingestão a partir da base vetorial e gravado num .npz ao lado
+# dela: vocabulário ordenado + listas de postagem contíguas, de modo que
+# cada termo da consulta é uma busca binária e uma fatia de arrays.
+# ------------------------------------------------------------------
+ARQUIVO_BM25 = "bm25.npz"
+K1 = 1.2
+B = 0.75
+
+# Código CBO (ex.: 2410-05 ou 241005) vira um único termo canônico "2410-05"
+_PADRAO_TERMO = re.compile(r"\b(\d{4})[-.]?(\d{2})\b|\w+")
+
+
+def termos_lexicos(texto: str) -> List[str]:
+    """Palavras sem acento em minúsculas; códigos CBO normalizados para 9999-99."""
+    sem_acento = unicodedata.normalize("NFKD", texto or "").encode("ascii", "ignore").decode("ascii")
+    return [
+        f"{m.group(1)}-{m.group(2)}" if m.group(1) else m.group(0)
+        for m in _PADRAO_TERMO.finditer(sem_acento.lower())
+    ]
+
+
+class IndiceBM25:
+    """Índice BM25 imutável em arrays NumPy (construído de uma vez, consultado muitas)."""
+
+    def __init__(self, ids: np.ndarray, termos: np.ndarray, inicio: np.ndarray,
+                 docs: np.ndarray, tfs: np.ndarray, comprimentos: np.ndarray):
+        self.ids = ids                      # id do chunk por posição
+        self.termos = termos                # vocabulário ordenado
+        self.inicio = inicio                # postagens do termo t: [inicio[t], inicio[t+1])
+        self.docs = docs
+        self.tfs = tfs
+        self.comprimentos = comprimentos
+        self.media = float(comprimentos.mean()) if len(comprimentos) else 0.0
+
+    @classmethod
+    def construir(cls, ids: List[str], textos: List[str]) -> "IndiceBM25":
+        postagens = {}
+        comprimentos = np.empty(len(textos), dtype=np.int32)
+        for d, texto in enumerate(textos):
+            termos = termos_lexicos(texto)
+            comprimentos[d] = len(termos)
+            contagem = {}
+            for termo in termos:
+                contagem[termo] = contagem.get(termo, 0) + 1
+            for termo, n in contagem.items():
+                postagens.setdefault(termo, []).append((d, n))
+        vocabulario = sorted(postagens)
+        inicio = np.zeros(len(vocabulario) + 1, dtype=np.int64)
+        inicio[1:] = np.cumsum([len(postagens[t]) for t in vocabulario])
+        pares = np.array([p for t in vocabulario for p in postagens[t]], dtype=np.int32).reshape(-1, 2)
+        return cls(
+            np.array(ids, dtype=str), np.array(vocabulario, dtype=str), inicio,
+            pares[:, 0].copy(), pares[:, 1].copy(), comprimentos,
+        )
+
+    def salvar(self, diretorio: str):
+        os.makedirs(diretorio, exist_ok=True)
+        tmp = os.path.join(diretorio, ARQUIVO_BM25 + ".tmp.npz")
+        np.savez(tmp, ids=self.ids, termos=self.termos, inicio=self.inicio,
+                 docs=self.docs, tfs=self.tfs, comprimentos=self.comprimentos)
+        os.replace(tmp, os.path.join(diretorio, ARQUIVO_BM25))
+
+    @classmethod
+    def carregar(cls, diretorio: str) -> Optional["IndiceBM25"]:
+        """Índice gravado na última ingestão, ou None se a base ainda não tiver um."""
+        try:
+            with np.load(os.path.join(diretorio, ARQUIVO_BM25)) as a:
+                return cls(a["ids"], a["termos"], a["inicio"], a["docs"], a["tfs"], a["comprimentos"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def buscar(self, consulta: str, k: int) -> List[Tuple[str, float]]:
+        """Os k chunks de maior pontuação BM25 para a consulta: [(id, pontuação)]."""
+        n = len(self.ids)
+        pontuacao = np.zeros(n, dtype=np.float32)
+        for termo in set(termos_lexicos(consulta)):
+            t = np.searchsorted(self.termos, termo)
+            if t == len(self.termos) or self.termos[t] != termo:
+                continue
+            fatia = slice(self.inicio[t], self.inicio[t + 1])
+            docs, tfs = self.docs[fatia], self.tfs[fatia]
+            idf = math.log(1 + (n - docs.size + 0.5) / (docs.size + 0.5))
+            norma = K1 * (1 - B + B * self.comprimentos[docs] / self.media)
+            pontuacao[docs] += idf * tfs * (K1 + 1) / (tfs + norma)
+        candidatos = np.flatnonzero(pontuacao)
+        if candidatos.size > k:
+            candidatos = candidatos[np.argpartition(-pontuacao[candidatos], k - 1)[:k]]
+        candidatos = candidatos[np.argsort(-pontuacao[candidatos], kind="stable")]
+        return [(str(self.ids[d]), float(pontuacao[d])) for d in candidatos]
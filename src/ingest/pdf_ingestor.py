@@ -1,34 +1,274 @@
-from langchain_community.document_loaders import DirectoryLoader, TextLoader, PyPDFLoader
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from langchain_community.document_loaders import TextLoader, PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 
-from langchain_openai import OpenAIEmbeddings
-import os
-from dotenv import load_dotenv
+if __package__ in (None, ""):   # executado como script: python ingest/pdf_ingestor.py
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest.embeddings import ARQUIVO_MANIFESTO, EmbeddingsLocais, criar_embeddings, nome_embeddings
+from ingest.cbo import DOCUMENTO_CBO, IndiceCBO, extrair_cbo
+from ingest.lexico import ARQUIVO_BM25, IndiceBM25
 
 load_dotenv()
 
-txt_loader = DirectoryLoader(
-    "documentos",
-    glob="**/*.txt",
-    loader_cls=TextLoader
-)
-txt_docs = txt_loader.load()
+# ------------------------------------------------------------------
+# Indexação incremental dos documentos (TXT + PDF) na base vetorial.
+# Um manifesto guarda o hash de cada arquivo e os ids (hashes) dos seus
+# chunks: só chunks novos ou alterados são embedados, e os que deixaram
+# de existir são apagados do Chroma.
+#
+# Pipeline: extração das páginas em um pool de processos → divisão em
+# chunks à medida que cada arquivo chega → embeddings em lotes, com
+# concorrência limitada e retry com backoff → upsert no Chroma → índice
+# lexical BM25 (ingest/lexico.py) sobre a base atualizada. A tabela da
+# CBO vira ainda um índice de consulta exata por código (ingest/cbo.py).
+# ------------------------------------------------------------------
+base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+docs_dir = os.path.join(base_dir, "documentos")
+chroma_dir = os.path.join(base_dir, "chrome_langchain_db")   # mesmo diretório lido por folha_tools
+manifesto_path = os.path.join(chroma_dir, ARQUIVO_MANIFESTO)
+
+VERSAO_MANIFESTO = 1
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+LOTE_EMBEDDINGS = int(os.getenv("INGESTAO_LOTE", "64"))
+CONCORRENCIA_EMBEDDINGS = int(os.getenv("INGESTAO_CONCORRENCIA", "4"))
+PROCESSOS = int(os.getenv("INGESTAO_PROCESSOS", str(os.cpu_count() or 1)))
+TENTATIVAS = 5
+
+LOADERS = {".txt": TextLoader, ".pdf": PyPDFLoader}
+
+splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+
+
+def config_indexacao(embeddings: str) -> dict:
+    """Parâmetros que, se mudarem, invalidam todos os chunks já indexados."""
+    return {
+        "versao": VERSAO_MANIFESTO,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embeddings": embeddings,
+    }
+
+
+def listar_documentos() -> Dict[str, str]:
+    """Caminho relativo (chave estável do manifesto) -> caminho absoluto."""
+    arquivos = {}
+    for raiz, _, nomes in os.walk(docs_dir):
+        for nome in nomes:
+            if os.path.splitext(nome)[1].lower() in LOADERS:
+                caminho = os.path.join(raiz, nome)
+                arquivos[os.path.relpath(caminho, docs_dir).replace(os.sep, "/")] = caminho
+    return dict(sorted(arquivos.items()))
+
+
+def hash_arquivo(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def id_chunk(fonte: str, texto: str, ocorrencia: int) -> str:
+    """Id determinístico do chunk: mesmo arquivo + mesmo texto => mesmo id."""
+    return hashlib.sha256(f"{fonte}\0{ocorrencia}\0{texto}".encode("utf-8")).hexdigest()
+
+
+def carregar_manifesto() -> dict:
+    try:
+        with open(manifesto_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"config": None, "arquivos": {}}
+
+
+def gravar_manifesto(manifesto: dict):
+    os.makedirs(chroma_dir, exist_ok=True)
+    tmp = manifesto_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, manifesto_path)
+
+
+def planejar(manifesto: dict, arquivos: Dict[str, str], config: dict) -> tuple:
+    """
+    Compara os arquivos atuais com o manifesto. Devolve
+    (novo manifesto, arquivos a reprocessar, ids a remover).
+    Arquivos com mesmo tamanho e mtime nem são relidos; com conteúdo igual
+    (mesmo hash) não são redivididos.
+    """
+    mesma_config = manifesto.get("config") == config
+    anteriores = manifesto.get("arquivos", {}) if mesma_config else {}
+    remover: List[str] = [] if mesma_config else [
+        i for info in manifesto.get("arquivos", {}).values() for i in info["chunks"]
+    ]
+    novos, alterados = {}, {}
+
+    for fonte, caminho in arquivos.items():
+        estado = os.stat(caminho)
+        anterior = anteriores.get(fonte)
+        if anterior and (anterior["tamanho"], anterior["mtime_ns"]) == (estado.st_size, estado.st_mtime_ns):
+            novos[fonte] = anterior
+            continue
+        sha = hash_arquivo(caminho)
+        if anterior and anterior["sha256"] == sha:
+            novos[fonte] = dict(anterior, tamanho=estado.st_size, mtime_ns=estado.st_mtime_ns)
+            continue
+        novos[fonte] = {"sha256": sha, "tamanho": estado.st_size, "mtime_ns": estado.st_mtime_ns, "chunks": []}
+        alterados[fonte] = (caminho, set(anterior["chunks"]) if anterior else set())
+
+    for fonte in anteriores.keys() - arquivos.keys():
+        remover.extend(anteriores[fonte]["chunks"])
+
+    return {"config": config, "arquivos": novos}, alterados, remover
+
+
+def carregar_paginas(caminho: str) -> list:
+    """Extrai as páginas de um arquivo (executa num processo do pool)."""
+    return LOADERS[os.path.splitext(caminho)[1].lower()](caminho).load()
+
+
+def chunks_por_arquivo(caminhos: Dict[str, str], processos: int) -> Iterator[tuple]:
+    """
+    Extrai os arquivos em paralelo e divide cada um assim que fica pronto.
+    Gera (fonte, chunks, ids) na ordem de conclusão.
+    """
+    if not caminhos:
+        return
+    with ProcessPoolExecutor(max_workers=max(1, min(processos, len(caminhos)))) as pool:
+        futuros = {pool.submit(carregar_paginas, caminho): fonte for fonte, caminho in caminhos.items()}
+        for futuro in as_completed(futuros):
+            fonte = futuros[futuro]
+            chunks = splitter.split_documents(futuro.result())
+            ids, vistos = [], {}
+            for chunk in chunks:
+                ocorrencia = vistos.get(chunk.page_content, 0)
+                vistos[chunk.page_content] = ocorrencia + 1
+                ids.append(id_chunk(fonte, chunk.page_content, ocorrencia))
+            yield fonte, chunks, ids
+
+
+def indexar_cbo(caminho: str) -> int:
+    """Extrai a tabela de códigos do documento da CBO para o índice de consulta exata."""
+    paginas = carregar_paginas(caminho)
+    codigos = extrair_cbo("\n".join(p.page_content for p in paginas))
+    IndiceCBO.construir(codigos).salvar(chroma_dir)
+    return len(codigos)
+
+
+def em_lotes(itens: Iterable, tamanho: int) -> Iterator[list]:
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def embedar_com_retry(embedder, textos: List[str]) -> List[List[float]]:
+    """Embeda um lote; falhas (limite de taxa, rede) são repetidas com backoff exponencial e jitter."""
+    for tentativa in range(TENTATIVAS):
+        try:
+            return embedder.embed_documents(textos)
+        except Exception as e:
+            if tentativa == TENTATIVAS - 1:
+                raise
+            espera = min(30.0, 2.0 ** tentativa) * random.uniform(0.5, 1.0)
+            print(f"AVISO: falha ao gerar embeddings ({e}); nova tentativa em {espera:.1f}s")
+            time.sleep(espera)
+
+
+def embedar_lotes(lotes: Iterable[list], embedder, concorrencia: int) -> Iterator[tuple]:
+    """
+    Embeda os lotes com no máximo `concorrencia` requisições em voo,
+    consumindo `lotes` sob demanda. Gera (lote, vetores) conforme terminam.
+    """
+    with ThreadPoolExecutor(max_workers=concorrencia, thread_name_prefix="embeddings") as pool:
+        em_voo = {}
+        for lote in lotes:
+            if len(em_voo) >= concorrencia:
+                prontos, _ = wait(em_voo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    yield em_voo.pop(futuro), futuro.result()
+            em_voo[pool.submit(embedar_com_retry, embedder, [chunk.page_content for _, chunk in lote])] = lote
+        for futuro in as_completed(list(em_voo)):
+            yield em_voo.pop(futuro), futuro.result()
+
+
+def indexar(embeddings: Optional[str] = None, embedder=None) -> dict:
+    """
+    Sincroniza o Chroma com documentos/ e grava o manifesto ao final.
+    `embeddings` é o provedor (padrão: EMBEDDINGS_BACKEND); `embedder`
+    permite injetar qualquer objeto compatível.
+    """
+    embeddings = nome_embeddings(embeddings)
+    embedder = embedder or criar_embeddings(embeddings, chroma_dir)
+    arquivos = listar_documentos()
+    anterior = carregar_manifesto()
+    config = config_indexacao(embeddings)
+    manifesto, alterados, remover = planejar(anterior, arquivos, config)
+
+    obsoletos: List[str] = []
+
+    def pendentes():
+        for fonte, chunks, ids in chunks_por_arquivo({f: c for f, (c, _) in alterados.items()}, PROCESSOS):
+            ja_indexados = alterados[fonte][1]
+            manifesto["arquivos"][fonte]["chunks"] = ids
+            atuais = set(ids)
+            obsoletos.extend(i for i in ja_indexados if i not in atuais)
+            yield from ((i, chunk) for i, chunk in zip(ids, chunks) if i not in ja_indexados)
 
-pdf_loader = DirectoryLoader(
-    "documentos",
-    glob="**/*.pdf",
-    loader_cls=PyPDFLoader
-)
-pdf_docs = pdf_loader.load()
+    db = Chroma(persist_directory=chroma_dir, embedding_function=embedder)
+    if anterior.get("config") != config:
+        # troca de provedor/dimensão: o Chroma mantém a dimensão da coleção mesmo
+        # depois de apagar todos os registros, então a coleção é recriada vazia
+        db.reset_collection()
+    elif remover:
+        # arquivos removidos: apaga antes, pois os mesmos ids podem voltar abaixo
+        db.delete(ids=remover)
+    adicionados = 0
+    for lote, vetores in embedar_lotes(em_lotes(pendentes(), LOTE_EMBEDDINGS), embedder, CONCORRENCIA_EMBEDDINGS):
+        db._collection.upsert(
+            ids=[i for i, _ in lote],
+            embeddings=vetores,
+            documents=[chunk.page_content for _, chunk in lote],
+            metadatas=[chunk.metadata or None for _, chunk in lote],
+        )
+        adicionados += len(lote)
+    if obsoletos:
+        db.delete(ids=obsoletos)
+    # índice BM25 e, nos embeddings locais, o IDF das consultas: recalculados sobre a base atualizada
+    locais = isinstance(embedder, EmbeddingsLocais)
+    if (adicionados or remover or obsoletos or (locais and embedder.idf is None)
+            or not os.path.exists(os.path.join(chroma_dir, ARQUIVO_BM25))):
+        base = db._collection.get(include=["documents"])
+        IndiceBM25.construir(base["ids"], base["documents"]).salvar(chroma_dir)
+        if locais:
+            embedder.salvar_idf(chroma_dir, embedder.calcular_idf(base["documents"]))
 
-all_docs = txt_docs + pdf_docs
+    # tabela da CBO: índice código -> título, consultado sem RAG (tool consultar_cbo)
+    if DOCUMENTO_CBO in arquivos and (DOCUMENTO_CBO in alterados or IndiceCBO.carregar(chroma_dir) is None):
+        indexar_cbo(arquivos[DOCUMENTO_CBO])
 
-splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-chunks = splitter.split_documents(all_docs)
+    gravar_manifesto(manifesto)
+    return {"arquivos": len(manifesto["arquivos"]), "adicionados": adicionados, "removidos": len(remover) + len(obsoletos)}
 
-embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-db = Chroma.from_documents(chunks, embeddings, persist_directory="/chrome_langchain_db")
-db.persist()
 
-print("Base vetorial unificada (TXT + PDF) criada com sucesso!")
+if __name__ == "__main__":
+    resumo = indexar(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(
+        f"Base vetorial (TXT + PDF) sincronizada: {resumo['arquivos']} arquivo(s), "
+        f"{resumo['adicionados']} chunk(s) embedado(s), {resumo['removidos']} removido(s)."
+    )
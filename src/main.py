@@ -107,7 +107,7 @@ api_process = subprocess.Popen(
 
 for attempt in range(30):  # Aumenta tentativas para 30 segundos
     try:
-        response = requests.get("http://127.0.0.1:8000/dados", timeout=5)
+        response = requests.get("http://127.0.0.1:8000/health", timeout=5)
         if response.status_code == 200:
             print("API está respondendo corretamente!")
             break
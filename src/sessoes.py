@@ -0,0 +1,210 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List
+
+# ------------------------------------------------------------------
+# Armazenamento das conversas por sessão (/chat e /chat/stream)
+# ------------------------------------------------------------------
+
+
+def limitar_historico(mensagens: List[Dict], max_mensagens: int) -> List[Dict]:
+    """
+    Mantém a mensagem de sistema e as mensagens mais recentes, cortando
+    sempre no início de um turno do usuário para não separar uma
+    chamada de tool (assistant.tool_calls) das respostas role=tool.
+    """
+    sistema = mensagens[:1] if mensagens and mensagens[0].get("role") == "system" else []
+    resto = mensagens[len(sistema):]
+    if len(resto) <= max_mensagens:
+        return mensagens
+    corte = len(resto) - max_mensagens
+    while corte < len(resto) and resto[corte].get("role") != "user":
+        corte += 1
+    return sistema + resto[corte:]
+
+
+# ------------------------------------------------------------------
+# Compactação por orçamento de tokens
+# ------------------------------------------------------------------
+MAX_CARACTERES_RESPOSTA = 300
+
+
+@lru_cache(maxsize=1)
+def _codificador():
+    """Encoder do tiktoken (o200k_base, usado pelos modelos gpt-4.1); None se indisponível."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def contar_tokens_texto(texto: str) -> int:
+    enc = _codificador()
+    if enc is None:
+        return len(texto) // 4 + 1   # estimativa quando o tiktoken não está disponível
+    return len(enc.encode(texto, disallowed_special=()))
+
+
+def contar_tokens(mensagens: List[Dict]) -> int:
+    """Estimativa de tokens de entrada das mensagens (conteúdo + tool_calls + overhead)."""
+    total = 3
+    for m in mensagens:
+        total += 4
+        if m.get("content"):
+            total += contar_tokens_texto(str(m["content"]))
+        for tc in m.get("tool_calls") or []:
+            funcao = tc.get("function", {})
+            total += contar_tokens_texto(funcao.get("name", "") + funcao.get("arguments", ""))
+    return total
+
+
+def _resumo_insight(insight: Dict[str, Any]) -> Dict[str, Any]:
+    resumo = {"titulo": insight.get("titulo", "")}
+    dados = insight.get("dados") or []
+    numeros = [v for v in dados if isinstance(v, (int, float))]
+    if numeros:
+        eixo_x = insight.get("eixo_x") or []
+        resumo.update(
+            pontos=len(numeros),
+            minimo=min(numeros),
+            maximo=max(numeros),
+            periodo=f"{eixo_x[0]}–{eixo_x[-1]}" if eixo_x else None,
+        )
+    elif dados and all(isinstance(d, dict) and "label" in d for d in dados):
+        resumo["valores"] = {d["label"]: d.get("value") for d in dados}
+    return resumo
+
+
+def resumir_resultado_tool(conteudo: str) -> str:
+    """
+    Substitui o JSON completo de uma tool por um resumo compacto:
+    título e números-chave dos insights, ou a resposta textual truncada.
+    """
+    try:
+        resultado = json.loads(conteudo)
+    except (TypeError, ValueError):
+        return conteudo[:MAX_CARACTERES_RESPOSTA]
+    if not isinstance(resultado, dict) or "resumo" in resultado:
+        return conteudo if isinstance(resultado, dict) else conteudo[:MAX_CARACTERES_RESPOSTA]
+    if "insights" in resultado:
+        resumo = {"resumo": [_resumo_insight(i) for i in resultado["insights"]]}
+    elif "resposta" in resultado:
+        resumo = {"resposta": str(resultado["resposta"])[:MAX_CARACTERES_RESPOSTA]}
+    else:
+        return conteudo[:MAX_CARACTERES_RESPOSTA]
+    return json.dumps(resumo, ensure_ascii=False, default=str)
+
+
+def _inicios_de_turno(mensagens: List[Dict], inicio: int) -> List[int]:
+    return [i for i in range(inicio, len(mensagens)) if mensagens[i].get("role") == "user"]
+
+
+def compactar_historico(mensagens: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Mantém o histórico dentro de `max_tokens`:
+    1) resultados de tools de turnos anteriores viram resumos compactos;
+    2) se ainda exceder, descarta turnos inteiros mais antigos (do "user"
+       até o próximo "user"), preservando o prompt de sistema e o último
+       turno, de modo que tool_calls e respostas role=tool nunca se separam.
+    """
+    sistema = mensagens[:1] if mensagens and mensagens[0].get("role") == "system" else []
+    turnos = _inicios_de_turno(mensagens, len(sistema))
+    ultimo_turno = turnos[-1] if turnos else len(mensagens)
+
+    compactadas = list(sistema)
+    for i in range(len(sistema), len(mensagens)):
+        m = mensagens[i]
+        if i < ultimo_turno and m.get("role") == "tool":
+            m = {**m, "content": resumir_resultado_tool(m.get("content") or "")}
+        compactadas.append(m)
+
+    while contar_tokens(compactadas) > max_tokens:
+        turnos = _inicios_de_turno(compactadas, len(sistema))
+        if len(turnos) < 2:
+            break
+        del compactadas[turnos[0]:turnos[1]]
+    return compactadas
+
+
+class SessoesMemoria:
+    """Sessões em memória do processo, com descarte LRU das mais antigas."""
+
+    def __init__(self, max_sessoes: int = 1000):
+        self.max_sessoes = max_sessoes
+        self._sessoes: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def carregar(self, sessao_id: str) -> List[Dict]:
+        with self._lock:
+            mensagens = self._sessoes.get(sessao_id)
+            if mensagens is None:
+                return []
+            self._sessoes.move_to_end(sessao_id)
+            return list(mensagens)
+
+    def salvar(self, sessao_id: str, mensagens: List[Dict]):
+        with self._lock:
+            self._sessoes[sessao_id] = list(mensagens)
+            self._sessoes.move_to_end(sessao_id)
+            while len(self._sessoes) > self.max_sessoes:
+                self._sessoes.popitem(last=False)
+
+    def remover(self, sessao_id: str):
+        with self._lock:
+            self._sessoes.pop(sessao_id, None)
+
+
+class SessoesSqlite:
+    """Sessões persistidas em SQLite (substituto local de um banco externo)."""
+
+    def __init__(self, caminho: str, max_sessoes: int = 1000):
+        self.caminho = caminho
+        self.max_sessoes = max_sessoes
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS sessoes ("
+                " id TEXT PRIMARY KEY, mensagens TEXT NOT NULL, atualizado REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS idx_sessoes_atualizado ON sessoes(atualizado)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def carregar(self, sessao_id: str) -> List[Dict]:
+        with self._conectar() as con:
+            linha = con.execute("SELECT mensagens FROM sessoes WHERE id = ?", (sessao_id,)).fetchone()
+        return json.loads(linha[0]) if linha else []
+
+    def salvar(self, sessao_id: str, mensagens: List[Dict]):
+        with self._conectar() as con:
+            con.execute(
+                "INSERT INTO sessoes (id, mensagens, atualizado) VALUES (?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET mensagens = excluded.mensagens, atualizado = excluded.atualizado",
+                (sessao_id, json.dumps(mensagens, ensure_ascii=False, default=str), time.time()),
+            )
+            con.execute(
+                "DELETE FROM sessoes WHERE id NOT IN"
+                " (SELECT id FROM sessoes ORDER BY atualizado DESC LIMIT ?)",
+                (self.max_sessoes,),
+            )
+
+    def remover(self, sessao_id: str):
+        with self._conectar() as con:
+            con.execute("DELETE FROM sessoes WHERE id = ?", (sessao_id,))
+
+
+def criar_store_sessoes():
+    """Escolhe o backend pela variável SESSOES_BACKEND (memoria | sqlite)."""
+    max_sessoes = int(os.getenv("SESSOES_MAX", "1000"))
+    if os.getenv("SESSOES_BACKEND", "memoria").lower() == "sqlite":
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        caminho = os.getenv("SESSOES_SQLITE_PATH", os.path.join(base_dir, "data", "sessoes.db"))
+        return SessoesSqlite(caminho, max_sessoes=max_sessoes)
+    return SessoesMemoria(max_sessoes=max_sessoes)
@@ -1,11 +1,12 @@
 # Home.py
 import streamlit as st
 import pandas as pd
-import requests
 import plotly.express as px
 from PIL import Image
 import os
 
+from dados_api import carregar_registros
+
 st.set_page_config(page_title="Página Inicial", page_icon="🏠", layout="wide")
 st.title("🏠 Página Inicial")
 
@@ -13,17 +14,8 @@ st.title("🏠 Página Inicial")
 # --- Carrega dados do colaborador via API ---
 # ------------------------------------------------------------------
 
-@st.cache_data
-def carregar_dados():
-    url = "http://127.0.0.1:8000/dados"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return pd.DataFrame(response.json())
-    else:
-        st.error("Erro ao carregar dados.")
-        return pd.DataFrame()
-
-df = carregar_dados()
+# só o primeiro registro: é o que a página exibe
+df = carregar_registros(limite=1)
 
 if df.empty:
     st.stop()
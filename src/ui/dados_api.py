@@ -0,0 +1,86 @@
+import os
+from typing import Optional, Sequence
+
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# ------------------------------------------------------------------
+# Cliente de dados das páginas Streamlit
+# Pede ao /dados só as colunas e o período em uso (formato split, com
+# gzip) numa Session compartilhada, que reaproveita as conexões. Cada
+# combinação de parâmetros fica em st.cache_data por CACHE_TTL segundos:
+# um rerun (mexer num slider, por exemplo) custa no máximo uma requisição
+# pequena. A API já devolve as linhas em ordem cronológica.
+# ------------------------------------------------------------------
+API_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
+CACHE_TTL = int(os.getenv("UI_CACHE_TTL", "300"))   # segundos
+TIMEOUT = 30
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+         "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+MES_NUM = {mes: i + 1 for i, mes in enumerate(MESES)}
+
+
+@st.cache_resource
+def sessao() -> requests.Session:
+    """Session única do processo Streamlit (pool de conexões com a API)."""
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    s.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip"})
+    return s
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _buscar(colunas: tuple, colaborador: Optional[str], periodo: Optional[tuple],
+            limite: Optional[int]) -> pd.DataFrame:
+    params = {"formato": "split"}
+    if colunas:
+        params["colunas"] = ",".join(colunas)
+    if colaborador:
+        params["colaborador"] = colaborador
+    if periodo:
+        params["mes_inicial"], params["ano_inicial"], params["mes_final"], params["ano_final"] = periodo
+    if limite:
+        params["limite"] = limite
+    response = sessao().get(f"{API_URL}/dados", params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    dados = response.json()
+    df = pd.DataFrame(dados["data"], columns=dados["columns"])
+    if "Mês" in df.columns:
+        df["Mês"] = pd.Categorical(df["Mês"], categories=MESES, ordered=True)
+        if "Ano" in df.columns:
+            df["Data"] = pd.to_datetime(
+                pd.DataFrame({"year": df["Ano"], "month": df["Mês"].map(MES_NUM).astype(int), "day": 1})
+            )
+    return df
+
+
+def carregar_registros(colunas: Sequence[str] = (), colaborador: Optional[str] = None,
+                       periodo: Optional[tuple] = None, limite: Optional[int] = None) -> pd.DataFrame:
+    """
+    Registros da folha só com as colunas pedidas (todas, se vazio), do
+    colaborador e do período (mes_inicial, ano_inicial, mes_final, ano_final).
+    Com Mês e Ano presentes, inclui a coluna Data. Em caso de erro mostra
+    a mensagem e devolve um DataFrame vazio (falhas não entram no cache).
+    """
+    try:
+        return _buscar(tuple(colunas), colaborador, tuple(periodo) if periodo else None, limite)
+    except requests.RequestException as e:
+        st.error(f"Erro ao carregar dados da API: {e}")
+        return pd.DataFrame()
+
+
+def carregar_datas(colaborador: Optional[str] = None) -> pd.Series:
+    """Competências (primeiro dia do mês) presentes na folha, em ordem."""
+    df = carregar_registros(["Mês", "Ano"], colaborador)
+    if df.empty:
+        return pd.Series(dtype="datetime64[ns]")
+    return df["Data"].drop_duplicates().reset_index(drop=True)
+
+
+def periodo_de(inicio: pd.Timestamp, fim: pd.Timestamp) -> tuple:
+    """Intervalo de datas no formato de período do /dados."""
+    return (inicio.month, inicio.year, fim.month, fim.year)
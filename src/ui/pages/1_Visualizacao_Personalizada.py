@@ -1,41 +1,26 @@
 import streamlit as st
-import pandas as pd
-import requests
 
+from dados_api import carregar_datas, carregar_registros, periodo_de
 
-@st.cache_data
-def carregar_dados():
-    url = "http://127.0.0.1:8000/dados"
-    response = requests.get(url)
-    if response.status_code == 200:
-        dados_json = response.json()
-        return pd.DataFrame(dados_json)
-    else:
-        st.error("Erro ao carregar dados da API.")
-        return pd.DataFrame()
 
-df = carregar_dados()
+# amostra de uma linha: nomes e tipos das colunas, sem baixar a folha inteira
+amostra = carregar_registros(limite=1)
 
-if df.empty:
+if amostra.empty:
     st.stop()
 
-meses_ordem = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
-               "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
-mes_to_num = {mes: i+1 for i, mes in enumerate(meses_ordem)}
-df["Mês"] = pd.Categorical(df["Mês"], categories=meses_ordem, ordered=True)
-df["Data"] = pd.to_datetime(df["Ano"].astype(str) + "-" + df["Mês"].map(mes_to_num).astype(str) + "-01")
-df = df.sort_values("Data")
-
 st.title("Visualização Personalizada da Folha")
 
 colunas_selecionadas = st.multiselect(
     "Selecione as colunas que deseja visualizar:",
-    options=df.columns.tolist(),
-    default=df.columns.tolist()[2:4]
+    options=[col for col in amostra.columns if col != "Data"],
+    default=amostra.columns.tolist()[2:4]
 )
 
 if colunas_selecionadas:
-    st.dataframe(df[colunas_selecionadas])
+    tabela = carregar_registros(colunas_selecionadas)
+    if not tabela.empty:
+        st.dataframe(tabela[colunas_selecionadas])
 else:
     st.warning("Selecione ao menos uma coluna para visualizar os dados.")
 
@@ -43,10 +28,10 @@ st.subheader("📈 Evolução")
 
 coluna_numerica = st.selectbox(
     "Selecione a coluna numérica para o gráfico:",
-    options=[col for col in df.select_dtypes(include='number').columns if col != "Ano"]
+    options=[col for col in amostra.select_dtypes(include='number').columns if col != "Ano"]
 )
 
-datas_unicas = df["Data"].drop_duplicates().sort_values()
+datas_unicas = carregar_datas()
 data_inicio, data_fim = st.select_slider(
     "Selecione o intervalo de tempo:",
     options=datas_unicas.tolist(),
@@ -54,7 +39,9 @@ data_inicio, data_fim = st.select_slider(
     format_func=lambda d: d.strftime("%B/%Y").capitalize()
 )
 
-filtro = df[(df["Data"] >= data_inicio) & (df["Data"] <= data_fim)]
+filtro = carregar_registros(["Mês", "Ano", coluna_numerica], periodo=periodo_de(data_inicio, data_fim))
+if filtro.empty:
+    st.stop()
 df_agrupado = filtro.groupby("Data")[coluna_numerica].sum().reset_index()
 
 st.line_chart(data=df_agrupado, x="Data", y=coluna_numerica)
@@ -1,7 +1,11 @@
 # chatbot.py
+import json
+import uuid
 import streamlit as st
 import requests
 
+API_STREAM_URL = "http://127.0.0.1:8000/chat/stream"
+
 st.set_page_config(page_title="Slip-Pay Agent", page_icon="🤖", layout="wide")
 st.title("🤖 Chat Bot")
 st.write("Converse com o agente. Qualquer insight retornado ficará salvo para a página “Insights Personalizados”.")
@@ -12,35 +16,10 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
 if "insights" not in st.session_state:
     st.session_state.insights = []
+# identifica a conversa desta aba junto à API (histórico separado por sessão)
+if "sessao_id" not in st.session_state:
+    st.session_state.sessao_id = uuid.uuid4().hex
 
-# ------------------------------------------------------------------
-# ---------- entrada ----------
-# ------------------------------------------------------------------
-pergunta = st.chat_input("Digite sua pergunta")
-if pergunta:
-    # exibe imediatamente a pergunta no histórico local
-    st.session_state.messages.append({"role": "user", "content": pergunta})
-
-    with st.spinner("Consultando agente..."):
-        try:
-            resp = requests.post(
-                "http://127.0.0.1:8000/chat",
-                json={"mensagem": pergunta}
-            )
-            resp.raise_for_status()
-            body = resp.json()
-            resposta_texto = body.get("resposta", "⚠️ Sem resposta.")
-            insights = body.get("insights", [])
-        except Exception as e:
-            resposta_texto = f"❌ Erro ao chamar API: {e}"
-            insights = []
-    
-    # ---------- armazena retorno ----------
-    st.session_state.messages.append({"role": "assistant", "content": resposta_texto})
-    # acumula todos os insights retornados
-    if isinstance(insights, list):
-        st.session_state.insights.extend(insights)
-        
 # ------------------------------------------------------------------
 # ---------- exibe histórico ----------
 # ------------------------------------------------------------------
@@ -55,7 +34,78 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+
+def render_msg(role: str, content: str) -> str:
+    cls = "user-msg" if role == "user" else "assistant-msg"
+    icon = "👤" if role == "user" else "🤖"
+    return f'<div class="msg {cls}">{icon} {content}</div>'
+
+
 for m in st.session_state.messages:
-    cls = "user-msg" if m["role"] == "user" else "assistant-msg"
-    icon = "👤" if m["role"] == "user" else "🤖"
-    st.markdown(f'<div class="msg {cls}">{icon} {m["content"]}</div>', unsafe_allow_html=True)
+    st.markdown(render_msg(m["role"], m["content"]), unsafe_allow_html=True)
+
+# ------------------------------------------------------------------
+# ---------- leitura do stream SSE ----------
+# ------------------------------------------------------------------
+def eventos_sse(resp):
+    """Gera (evento, dados) a partir de uma resposta text/event-stream."""
+    evento, dados = "message", []
+    for linha in resp.iter_lines(decode_unicode=True):
+        if not linha:
+            if dados:
+                yield evento, json.loads("\n".join(dados))
+            evento, dados = "message", []
+        elif linha.startswith("event:"):
+            evento = linha[len("event:"):].strip()
+        elif linha.startswith("data:"):
+            dados.append(linha[len("data:"):].strip())
+
+# ------------------------------------------------------------------
+# ---------- entrada ----------
+# ------------------------------------------------------------------
+pergunta = st.chat_input("Digite sua pergunta")
+if pergunta:
+    # exibe imediatamente a pergunta no histórico local
+    st.session_state.messages.append({"role": "user", "content": pergunta})
+    st.markdown(render_msg("user", pergunta), unsafe_allow_html=True)
+
+    status = st.empty()
+    resposta_box = st.empty()
+    resposta_texto = ""
+    insights = []
+
+    status.caption("Consultando agente...")
+    try:
+        with requests.post(
+            API_STREAM_URL,
+            json={"mensagem": pergunta},
+            headers={"X-Sessao-Id": st.session_state.sessao_id},
+            stream=True,
+            timeout=120,
+        ) as resp:
+            resp.raise_for_status()
+            resp.encoding = "utf-8"
+            for evento, dados in eventos_sse(resp):
+                if evento == "token":
+                    resposta_texto += dados.get("conteudo", "")
+                    resposta_box.markdown(render_msg("assistant", resposta_texto + "▌"), unsafe_allow_html=True)
+                elif evento == "ferramenta":
+                    status.caption(f"🔧 Executando {dados.get('nome', '')}...")
+                elif evento == "insight":
+                    insights.append(dados.get("resultado"))
+                    status.caption(f"📊 {len(insights)} resultado(s) recebido(s)")
+                elif evento == "fim":
+                    resposta_texto = dados.get("resposta") or resposta_texto
+                elif evento == "erro":
+                    resposta_texto = f"❌ Erro no agente: {dados.get('detalhe', '')}"
+    except Exception as e:
+        resposta_texto = f"❌ Erro ao chamar API: {e}"
+
+    status.empty()
+    resposta_texto = resposta_texto or "⚠️ Sem resposta."
+    resposta_box.markdown(render_msg("assistant", resposta_texto), unsafe_allow_html=True)
+
+    # ---------- armazena retorno ----------
+    st.session_state.messages.append({"role": "assistant", "content": resposta_texto})
+    # acumula todos os insights retornados
+    st.session_state.insights.extend(i for i in insights if isinstance(i, dict))